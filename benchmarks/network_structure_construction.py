@@ -0,0 +1,57 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+# Usage: python -m benchmarks.network_structure_construction
+#
+import logging
+import time
+
+import pypowsybl.network as pn
+
+import yagat.networkstructure as ns
+from benchmarks.synthetic_network import create_synthetic_network
+
+SAMPLE_NETWORKS = {
+    'ieee14': pn.create_ieee14,
+    'ieee118': pn.create_ieee118,
+    'ieee300': pn.create_ieee300,
+    'four_substations_node_breaker': pn.create_four_substations_node_breaker_network,
+}
+
+SYNTHETIC_SIZES = [1000, 5000, 20000]
+
+
+# time to first screen (structure and tree content) and time to build the connection index
+def time_construction(network: pn.Network, repeat: int = 3) -> tuple[float, float]:
+    best_first_screen = float('inf')
+    best_connections = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        structure = ns.NetworkStructure(network)
+        _ = structure.substations, structure.voltage_levels
+        first_screen = time.perf_counter()
+        _ = structure.connection_table
+        end = time.perf_counter()
+        best_first_screen = min(best_first_screen, first_screen - start)
+        best_connections = min(best_connections, end - first_screen)
+    return best_first_screen, best_connections
+
+
+def main():
+    logging.disable(logging.INFO)
+    print(f'{"network":<32}{"buses":>8}{"connections":>14}{"first screen (s)":>20}{"connection index (s)":>24}')
+    networks = [(name, factory()) for name, factory in SAMPLE_NETWORKS.items()]
+    networks += [(f'synthetic_{size}', create_synthetic_network(size)) for size in SYNTHETIC_SIZES]
+    for name, network in networks:
+        bus_count = len(network.get_bus_breaker_view_buses(attributes=[]))
+        first_screen, connections = time_construction(network)
+        connection_count = len(ns.NetworkStructure(network).connection_table)
+        print(f'{name:<32}{bus_count:>8}{connection_count:>14}{first_screen:>20.3f}{connections:>24.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+# Usage: python -m benchmarks.network_structure_memory
+#
+import gc
+import logging
+import tracemalloc
+
+import pypowsybl.network as pn
+
+import yagat.networkstructure as ns
+from benchmarks.synthetic_network import create_synthetic_network
+
+SAMPLE_NETWORKS = {
+    'ieee118': pn.create_ieee118,
+    'ieee300': pn.create_ieee300,
+    'four_substations_node_breaker': pn.create_four_substations_node_breaker_network,
+    'micro_grid_be': pn.create_micro_grid_be_network,
+}
+
+SYNTHETIC_SIZES = [20000]
+
+
+# memory retained by a network structure with all its tables loaded, in MB
+def tables_memory(network: pn.Network, compact: bool) -> float:
+    gc.collect()
+    tracemalloc.start()
+    structure = ns.NetworkStructure(network, compact=compact)
+    structure.load_tables()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    return retained / (1024 * 1024)
+
+
+def main():
+    logging.disable(logging.INFO)
+    print(f'{"network":<32}{"default (MB)":>14}{"compact (MB)":>14}{"ratio":>8}')
+    networks = [(name, factory()) for name, factory in SAMPLE_NETWORKS.items()]
+    networks += [(f'synthetic_{size}', create_synthetic_network(size)) for size in SYNTHETIC_SIZES]
+    for name, network in networks:
+        default = tables_memory(network, compact=False)
+        compact = tables_memory(network, compact=True)
+        print(f'{name:<32}{default:>14.2f}{compact:>14.2f}{compact / default:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
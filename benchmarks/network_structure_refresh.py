@@ -0,0 +1,76 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+# Usage: python -m benchmarks.network_structure_refresh
+#
+import logging
+import os
+import time
+
+import pypowsybl.network as pn
+
+import yagat.networkstructure as ns
+from benchmarks.synthetic_network import create_synthetic_network
+
+SAMPLE_NETWORKS = {
+    'ieee300': pn.create_ieee300,
+}
+
+SYNTHETIC_SIZES = [5000, 20000]
+
+WORKER_COUNTS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+# time of each table when loaded one after another, as done by the lazy get_table, best of repeat
+def time_sequential(structure: ns.NetworkStructure, repeat: int = 3) -> tuple[float, dict[str, float]]:
+    best = float('inf')
+    best_timings = {}
+    for _ in range(repeat):
+        structure.refresh()
+        timings = {}
+        start = time.perf_counter()
+        for name in structure.table_names:
+            table_start = time.perf_counter()
+            structure.get_table(name)
+            timings[name] = time.perf_counter() - table_start
+        total = time.perf_counter() - start
+        if total < best:
+            best, best_timings = total, timings
+    return best, best_timings
+
+
+def time_concurrent(structure: ns.NetworkStructure, max_workers: int, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        structure.refresh()
+        start = time.perf_counter()
+        structure.load_tables(max_workers=max_workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    logging.disable(logging.INFO)
+    print(f'cpu count: {os.cpu_count()}')
+    networks = [(name, factory()) for name, factory in SAMPLE_NETWORKS.items()]
+    networks += [(f'synthetic_{size}', create_synthetic_network(size)) for size in SYNTHETIC_SIZES]
+    for name, network in networks:
+        structure = ns.NetworkStructure(network)
+        sequential, sequential_timings = time_sequential(structure)
+        print(f'\n{name}')
+        print(f'{"table":<40}{"sequential (s)":>16}')
+        for table, duration in sorted(sequential_timings.items(), key=lambda item: -item[1]):
+            print(f'{table:<40}{duration:>16.3f}')
+        print(f'{"total":<40}{sequential:>16.3f}')
+        print(f'{"workers":<40}{"refresh (s)":>16}{"speedup":>10}')
+        for max_workers in WORKER_COUNTS:
+            concurrent = time_concurrent(structure, max_workers)
+            print(f'{max_workers:<40}{concurrent:>16.3f}{sequential / concurrent:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
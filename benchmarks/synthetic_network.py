@@ -0,0 +1,57 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+import numpy as np
+import pandas as pd
+import pypowsybl.network as pn
+
+
+# bus/breaker network with one voltage level and two coupled buses per substation, a load and a generator
+# on each voltage level, and a meshed set of lines (ring plus random chords)
+def create_synthetic_network(substation_count: int, seed: int = 0) -> pn.Network:
+    rng = np.random.default_rng(seed)
+    network = pn.create_empty(f'synthetic-{substation_count}')
+
+    idx = np.arange(substation_count)
+    s_ids = [f'S{i}' for i in idx]
+    vl_ids = [f'VL{i}' for i in idx]
+    network.create_substations(id=s_ids, name=[f'Substation {i}' for i in idx],
+                               country=np.where(idx % 2 == 0, 'FR', 'BE').tolist())
+    network.create_voltage_levels(id=vl_ids, substation_id=s_ids, topology_kind=['BUS_BREAKER'] * substation_count,
+                                  nominal_v=np.where(idx % 3 == 0, 225.0, 400.0).tolist(),
+                                  high_voltage_limit=[440.0] * substation_count,
+                                  low_voltage_limit=[200.0] * substation_count)
+
+    b1_ids = [f'B{i}_1' for i in idx]
+    b2_ids = [f'B{i}_2' for i in idx]
+    network.create_buses(id=b1_ids + b2_ids, voltage_level_id=vl_ids + vl_ids)
+    network.create_switches(id=[f'SW{i}' for i in idx], voltage_level_id=vl_ids, bus1_id=b1_ids, bus2_id=b2_ids,
+                            kind=['BREAKER'] * substation_count, open=[False] * substation_count)
+
+    network.create_loads(id=[f'LD{i}' for i in idx], voltage_level_id=vl_ids, bus_id=b2_ids,
+                         p0=rng.uniform(10, 100, substation_count).tolist(),
+                         q0=rng.uniform(0, 20, substation_count).tolist())
+    network.create_generators(id=[f'G{i}' for i in idx], voltage_level_id=vl_ids, bus_id=b1_ids,
+                              target_p=rng.uniform(10, 100, substation_count).tolist(),
+                              min_p=[0.0] * substation_count, max_p=[200.0] * substation_count,
+                              target_v=[410.0] * substation_count, target_q=[0.0] * substation_count,
+                              voltage_regulator_on=(idx % 4 == 0).tolist())
+
+    # ring + random chords, only between voltage levels of the same nominal voltage
+    ends = np.concatenate([np.roll(idx, -1), rng.integers(0, substation_count, substation_count)])
+    starts = np.concatenate([idx, idx])
+    same_v = (starts % 3 == 0) == (ends % 3 == 0)
+    keep = (starts != ends) & same_v
+    starts, ends = starts[keep], ends[keep]
+    line_count = len(starts)
+    network.create_lines(pd.DataFrame(index=pd.Index([f'L{i}' for i in range(line_count)], name='id'),
+                                      data={'voltage_level1_id': [vl_ids[i] for i in starts],
+                                            'bus1_id': [b1_ids[i] for i in starts],
+                                            'voltage_level2_id': [vl_ids[i] for i in ends],
+                                            'bus2_id': [b1_ids[i] for i in ends],
+                                            'r': 0.5, 'x': 5.0, 'g1': 0.0, 'b1': 0.0, 'g2': 0.0, 'b2': 0.0}))
+    return network
@@ -0,0 +1,88 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+import numpy as np
+import pandas as pd
+import pytest
+
+from yagat.frames.impl.data_frame_rows import DataFrameRows, to_python
+
+
+class TestDataFrameRows:
+
+    @pytest.fixture
+    def setup(self):
+        df = pd.DataFrame({'name': ['a', 'b', 'c'], 'p': [1.5, 0.5, -2.0], 'count': [1, 2, 3],
+                           'open': [True, False, True]}, index=['L1', 'L2', 'L3'])
+        rows = DataFrameRows(df, [to_python] * len(df.columns))
+        yield df, rows
+
+    def test_rows(self, setup):
+        df, rows = setup
+        # same rows as the list of lists copied to the sheet for small tables
+        eager = [values.tolist() for values in df.to_numpy()]
+        assert len(rows) == 3
+        assert rows.column_count == 4
+        assert isinstance(rows, list)
+        assert rows[0] == eager[0]
+        assert rows[-1] == eager[-1]
+        assert rows[1:] == eager[1:]
+        assert list(rows) == eager
+        assert [row.copy() for row in reversed(rows)] == eager[::-1]
+        assert rows.copy() == eager
+        assert rows == eager
+        assert eager[2] in rows
+        with pytest.raises(IndexError):
+            _ = rows[3]
+
+    def test_cells(self, setup):
+        df, rows = setup
+        row = rows[0]
+        assert len(row) == 4
+        assert row[0] == 'a'
+        assert row[-1] is True
+        assert type(row[2]) is int
+        assert row[1:3] == [1.5, 1]
+        assert 'a' in row
+        with pytest.raises(IndexError):
+            _ = row[4]
+
+    def test_display(self, setup):
+        df, _ = setup
+        rows = DataFrameRows(df, [str, lambda value: f'{value:.2f}', int, bool])
+        assert rows[0] == ['a', '1.50', 1, True]
+        # values the display function rejects are shown as they are
+        rows = DataFrameRows(pd.DataFrame({'count': [1.0, np.nan]}), [int])
+        assert rows[0][0] == 1
+        assert np.isnan(rows[1][0])
+
+    def test_write_through(self, setup):
+        df, rows = setup
+        # cells written by the sheet, and refreshed rows, are read back without modifying the DataFrame
+        rows[0][1] = 10.0
+        assert rows[0][1] == 10.0
+        rows.set_row(2, np.array(['z', 3.0, 30, False], dtype=object))
+        assert rows[2] == ['z', 3.0, 30, False]
+        rows[1] = ['y', 2.0, 20, True]
+        assert list(rows) == [['a', 10.0, 1, True], ['y', 2.0, 20, True], ['z', 3.0, 30, False]]
+        assert df.loc['L1', 'p'] == 1.5
+        assert df['name'].tolist() == ['a', 'b', 'c']
+
+    def test_fixed_size(self, setup):
+        _, rows = setup
+        # no-op resizes of the sheet are accepted, any other change of size is not supported
+        rows.extend([])
+        rows[3:] = []
+        rows[0].extend([])
+        for change in [lambda: rows.append([]), lambda: rows.insert(0, []), lambda: rows.pop(),
+                       lambda: rows.extend([[]]), lambda: rows.sort(), lambda: rows.clear(),
+                       lambda: rows.__delitem__(0), lambda: rows[0].append(1), lambda: rows[0].pop(),
+                       lambda: rows[0].extend([1])]:
+            with pytest.raises(TypeError):
+                change()
+        assert len(rows) == 3
+        assert len(rows[0]) == 4
@@ -5,10 +5,14 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 # SPDX-License-Identifier: MPL-2.0
 #
+import os
+
 import pypowsybl.network as pn
 import pypowsybl.loadflow as lf
 import pytest
+
 import numpy as np
+import pandas as pd
 
 import yagat.networkstructure as ns
 
@@ -120,6 +124,189 @@ class TestNetworkStructureIeee9:
         connection_data = structure.get_connection_data('L5-4-0', 2)
         assert connection_data.p1 == pytest.approx(-40.7, 0.1)
 
+    def test_refresh_results_only(self, setup):
+        network, structure = setup
+        buses = structure.buses
+        lines = structure.lines
+        lf.run_ac(network)
+        structure.refresh(results_only=True)
+        assert structure.buses is buses
+        assert structure.lines is lines
+        assert structure.get_connection_data('L5-4-0', 2).p1 == pytest.approx(-40.7, 0.1)
+        assert structure.buses.loc['VL1_0'].v_mag == pytest.approx(network.get_buses().loc['VL1_0'].v_mag)
+        results_only = structure.generators.copy()
+        structure.refresh()
+        assert structure.buses is not buses
+        pd.testing.assert_frame_equal(results_only, structure.generators)
+
+    def test_lazy_tables(self, setup):
+        _, structure = setup
+        assert not structure.is_table_loaded('generators')
+        assert not structure.is_table_loaded('static_var_compensators')
+        generators = structure.generators
+        assert structure.is_table_loaded('generators')
+        assert structure.generators is generators
+        assert len(structure.get_voltage_level('VL1').connections) == 5
+        assert not structure.is_table_loaded('static_var_compensators')
+        generation = structure.generation
+        structure.refresh()
+        assert structure.generation == generation + 1
+        assert not structure.is_table_loaded('generators')
+        assert structure.generators is not generators
+
+    def test_sorted_orders(self, setup):
+        _, structure = setup
+        voltage_levels = structure.voltage_levels
+        nominal_v = [vl.get_data().nominal_v for vl in voltage_levels]
+        assert nominal_v == sorted(nominal_v, reverse=True)
+        assert voltage_levels == structure.voltage_levels
+        assert voltage_levels is not structure.voltage_levels
+        names = [s.name for s in structure.substations]
+        assert names == sorted(names)
+        for substation in structure.substations:
+            assert {vl.voltage_level_id for vl in substation.voltage_levels} == set(substation._voltage_levels)
+        structure.refresh()
+        assert structure.voltage_levels == voltage_levels
+
+    def test_voltage_level_buses_index(self, setup):
+        network, structure = setup
+        for bus_view, df in [(ns.BusView.BUS_BRANCH, structure.buses),
+                             (ns.BusView.BUS_BREAKER, structure.buses_bus_breaker_view)]:
+            for vl in structure.voltage_levels:
+                pd.testing.assert_frame_equal(vl.get_buses(bus_view), df.loc[df['voltage_level_id'] == vl.voltage_level_id])
+        lf.run_ac(network)
+        structure.refresh(results_only=True)
+        buses = structure.get_voltage_level('VL1').get_buses(ns.BusView.BUS_BRANCH)
+        assert not np.isnan(buses.loc['VL1_1', 'v_mag'])
+        assert buses.loc['VL1_1', 'v_mag'] == network.get_buses().loc['VL1_1', 'v_mag']
+
+    def test_bus_connections(self, setup):
+        network, structure = setup
+        vl1 = structure.get_voltage_level('VL1')
+        for bus_view in ns.BusView:
+            for bus_id in vl1.get_buses(bus_view).index:
+                assert vl1.get_bus_connections(bus_view, bus_id) == \
+                       [c for c in vl1.connections if c.get_bus_id(bus_view) == bus_id]
+        bus_id = structure.get_connection('L5-4-0', 2).get_bus_id(ns.BusView.BUS_BRANCH)
+        assert structure.get_connection('L5-4-0', 2) in vl1.get_bus_connections(ns.BusView.BUS_BRANCH, bus_id)
+        version = structure.topology_version
+        network.disconnect('L5-4-0')
+        structure.refresh()
+        assert structure.topology_version > version
+        assert structure.get_connection('L5-4-0', 2) not in vl1.get_bus_connections(ns.BusView.BUS_BRANCH, bus_id)
+
+    def test_connections_values(self, setup):
+        network, structure = setup
+        lf.run_ac(network)
+        structure.refresh(results_only=True)
+        connections = structure.get_voltage_level('VL1').connections
+        values = structure.get_connections_values(connections)
+        assert len(values) == len(connections)
+        for connection, connection_values in zip(connections, values):
+            assert connection_values.p == pytest.approx(connection.get_p())
+            assert connection_values.q == pytest.approx(connection.get_q())
+            assert connection_values.i == pytest.approx(connection.get_i())
+            assert connection_values.connected == connection.get_connected()
+            assert connection_values.bus_id == connection.get_bus_id(ns.BusView.BUS_BRANCH)
+            assert connection_values.bus_breaker_bus_id == connection.get_bus_id(ns.BusView.BUS_BREAKER)
+        assert len(structure.get_connections_values([])) == 0
+
+    def test_components(self, setup):
+        network, structure = setup
+        components = structure.components
+        assert components.index.tolist() == ['CC0 SC0']
+        assert components.loc['CC0 SC0', 'bus_count'] == len(structure.buses)
+        assert components.loc['CC0 SC0', 'status'] == ''
+        structure.lf_components_results = lf.run_ac(network)
+        structure.refresh(results_only=True)
+        components = structure.components
+        assert components.loc['CC0 SC0', 'status'] == 'CONVERGED'
+        assert components.loc['CC0 SC0', 'iteration_count'] > 0
+        assert components.loc['CC0 SC0', 'reference_bus_id'] != ''
+
+    def test_incremental_refresh(self, setup):
+        network, structure = setup
+        structure.load_tables(['generators', 'loads'])
+        changed = []
+        structure.add_rows_changed_listener(lambda name, ids: changed.append((name, ids)))
+        generation = structure.generation
+        network.update_generators(id='B2-G', target_p=42.0)
+        structure.update_value('generators', 'B2-G', 'target_p', 42.0)
+        network.update_loads(id='B5-L', name='Load 5')
+        structure.update_value('loads', 'B5-L', 'name', 'Load 5')
+        assert structure.get_dirty_rows('generators') == {'B2-G': {'target_p'}}
+        version = structure.dirty_version
+        structure.refresh(incremental=True)
+        assert structure.generation == generation
+        assert structure.dirty_version == version
+        assert structure.get_dirty_rows('generators') == {}
+        assert changed == [('generators', ['B2-G']), ('loads', ['B5-L'])]
+        assert structure.generators.loc['B2-G', 'target_p'] == 42.0
+        assert structure.get_connection('B5-L', None).name == 'Load 5'
+        pd.testing.assert_frame_equal(structure.loads, ns.NetworkStructure(network).loads)
+        # topology edits require a full refresh
+        network.update_lines(id='L5-4-0', connected1=False)
+        structure.update_value('lines', 'L5-4-0', 'connected1', False)
+        structure.refresh(incremental=True)
+        assert structure.generation == generation + 1
+        assert structure.get_dirty_rows('lines') == {}
+
+    def test_diff(self, setup):
+        network, structure = setup
+        before = structure.snapshot(['generators', 'loads', 'buses'])
+        assert structure.diff(before).empty
+        network.update_loads(id='B5-L', p0=125.5)
+        network.update_generators(id='B2-G', target_p=163.0000001)
+        lf.run_ac(network)
+        structure.refresh()
+        diff = structure.diff(before, tolerances={'v_mag': 1.0})
+        loads = diff[diff['table'] == 'loads']
+        p0 = loads[loads['column'] == 'p0']
+        assert p0.index.tolist() == ['B5-L']
+        assert p0.iloc[0]['change'] == ns.ChangeType.CHANGED
+        assert p0.iloc[0]['delta'] == pytest.approx(0.5)
+        # below the default tolerance
+        assert 'target_p' not in diff[diff['table'] == 'generators']['column'].tolist()
+        # within the v_mag tolerance, but not the v_angle one
+        buses = diff[diff['table'] == 'buses']
+        assert 'v_mag' not in buses['column'].tolist()
+        assert 'v_angle' in buses['column'].tolist()
+        after = structure.snapshot(['loads'])
+        added = ns.diff_tables('loads', before['loads'].drop('B5-L'), after['loads'])
+        assert added.loc['B5-L', 'change'] == ns.ChangeType.ADDED
+        removed = ns.diff_tables('loads', before['loads'], after['loads'].drop('B5-L'))
+        assert removed.loc['B5-L', 'change'] == ns.ChangeType.REMOVED
+
+    def test_neighbourhood(self, setup):
+        network, structure = setup
+        assert structure.get_neighbourhood_voltage_levels('VL1', 0) == ['VL1']
+        neighbourhood = structure.get_neighbourhood_voltage_levels('VL1', 1)
+        assert neighbourhood == ['VL1', 'VL5', 'VL6']
+        assert structure.get_neighbourhood_voltage_levels('VL1', 1) == neighbourhood
+        assert set(structure.get_neighbourhood_voltage_levels('VL1', 2)) == {'VL1', 'VL2', 'VL3', 'VL5', 'VL6'}
+        assert len(structure.get_neighbourhood_voltage_levels('S1', 10)) == len(structure.voltage_levels)
+        with pytest.raises(RuntimeError):
+            structure.get_neighbourhood_voltage_levels('unknown', 1)
+        network.update_lines(id='L5-4-0', connected1=False)
+        structure.refresh()
+        assert structure.get_neighbourhood_voltage_levels('VL1', 1) == ['VL1', 'VL6']
+        # a substation without voltage level has an empty neighbourhood
+        network.create_substations(id='S_EMPTY')
+        assert ns.NetworkStructure(network).get_neighbourhood_voltage_levels('S_EMPTY', 1) == []
+
+    def test_load_tables_concurrently(self, setup):
+        network, structure = setup
+        lazy_structure = ns.NetworkStructure(network)
+        timings = structure.load_tables(max_workers=4)
+        assert 'lines' in timings
+        assert 'components' not in timings
+        for name in ['voltage_levels', 'buses', 'buses_bus_breaker_view', 'components', 'lines', 'generators']:
+            assert structure.is_table_loaded(name)
+            pd.testing.assert_frame_equal(structure.get_table(name), lazy_structure.get_table(name))
+        assert structure.load_tables() == {}
+        structure.refresh(concurrent=True)
+        assert structure.is_table_loaded('switches')
+
     def test_connection_from_structure(self, setup):
         _, structure = setup
         t410_1 = structure.get_connection('T4-1-0', 1)
@@ -127,6 +314,20 @@ class TestNetworkStructureIeee9:
         assert t410_1.voltage_level.voltage_level_id == 'VL1'
         assert t410_2.voltage_level.voltage_level_id == 'VL1'
 
+    def test_connection_table(self, setup):
+        _, structure = setup
+        l540_1 = structure.get_connection('L5-4-0', 1)
+        l540_2 = structure.get_connection('L5-4-0', 2)
+        assert l540_1 == structure.get_connection('L5-4-0', 1)
+        assert l540_1 != l540_2
+        assert len({l540_1, l540_2, structure.get_connection('L5-4-0', 2)}) == 2
+        assert not hasattr(l540_1, '__dict__')
+        assert structure.get_other_sides(l540_1) == [l540_2]
+        assert structure.get_connection('L5-4-0', None) is None
+        assert structure.get_connection('L5-4-0', 3) is None
+        assert structure.get_connection('B1-G', 1) is None
+        assert len(structure.connection_table) == sum(len(vl.connections) for vl in structure.voltage_levels)
+
 
 class TestNetworkStructureMicroGridBe:
 
@@ -165,3 +366,208 @@ class TestNetworkStructureMicroGridBe:
         s1 = brussels_110.get_connection('d771118f-36e9-4115-a128-cc3d9ce3e3da')
         assert s1.name == 'BE_S1'
         assert s1.equipment_type == ns.EquipmentType.SHUNT_COMPENSATOR
+
+    def test_shunt_compensator_types(self, setup):
+        network, structure = setup
+        shunts = structure.shunt_compensators
+        b = structure.get_table('linear_shunt_compensator_sections')['b_per_section']
+        for shunt_id in shunts.index:
+            expected = ns.ShuntCompensatorType.CAPACITOR if b[shunt_id] > 0 else ns.ShuntCompensatorType.REACTOR
+            assert shunts.loc[shunt_id, 'shunt_type'] == expected
+            assert structure.get_shunt_compensator_type(structure.get_connection(shunt_id, None)) == expected
+
+    def test_compact_tables(self, setup):
+        network, structure = setup
+        compact = ns.NetworkStructure(network, compact=True)
+        assert compact.compact
+        compact.load_tables()
+        loads = compact.get_table('loads')
+        generators = compact.get_table('generators')
+        assert isinstance(loads['voltage_level_id'].dtype, pd.CategoricalDtype)
+        # one dictionary per domain, shared by all tables
+        assert loads['voltage_level_id'].dtype == generators['voltage_level_id'].dtype
+        assert (loads['voltage_level_id'].astype(str) == structure.get_table('loads')['voltage_level_id']).all()
+        assert [vl.voltage_level_id for vl in compact.voltage_levels] == \
+               [vl.voltage_level_id for vl in structure.voltage_levels]
+        for vl in structure.voltage_levels:
+            assert [c.equipment_id for c in compact.get_voltage_level(vl.voltage_level_id).connections] == \
+                   [c.equipment_id for c in vl.connections]
+
+    def test_other_sides(self, setup):
+        _, structure = setup
+        tr3_id = '84ed55f4-61f5-4d9d-8755-bba7b877a246'
+        tr3_legs = [structure.get_connection(tr3_id, side) for side in range(1, 4)]
+        assert structure.get_other_sides(tr3_legs[0]) == tr3_legs[1:]
+        assert structure.get_other_sides(tr3_legs[1]) == [tr3_legs[0], tr3_legs[2]]
+        assert structure.get_other_sides(structure.get_connection('78736387-5f60-4832-b3fe-d50daf81b0a6', None)) == []
+
+    def test_diff_duplicated_ids(self, setup):
+        network, structure = setup
+        # an area with several boundaries: its id is repeated in the areas_boundaries index
+        dangling_lines = network.get_dangling_lines().index.tolist()
+        network.create_areas(id='A1', area_type='ControlArea')
+        network.create_areas_boundaries(id=['A1', 'A1'], element=dangling_lines[:2], ac=[True, True])
+        structure.refresh()
+        before = structure.snapshot(['areas', 'areas_boundaries'])
+        assert not before['areas_boundaries'].index.is_unique
+        assert structure.diff(before).empty
+        network.create_areas_boundaries(id=['A1', 'A1', 'A1'], element=dangling_lines[:3], ac=[True, True, True])
+        structure.refresh()
+        diff = structure.diff(before)
+        boundaries = diff[diff['table'] == 'areas_boundaries']
+        # rows aligned by id and occurrence: the first two boundaries are unchanged, the third one is added
+        assert boundaries['change'].tolist() == [str(ns.ChangeType.ADDED)]
+        assert boundaries.index.tolist() == ['A1']
+
+
+class TestNetworkStructureFourSubstationsNodeBreaker:
+
+    @pytest.fixture
+    def setup(self):
+        network = pn.create_four_substations_node_breaker_network()
+        structure = ns.NetworkStructure(network)
+        yield network, structure
+
+    def test_retained_switch_buses(self, setup):
+        network, structure = setup
+        switch = structure.get_connection('S1VL1_LD1_BREAKER', 2)
+        assert structure.is_retained(switch)
+        topology = network.get_bus_breaker_topology('S1VL1')
+        bus_id = topology.switches.loc['S1VL1_LD1_BREAKER', 'bus2_id']
+        assert switch.get_bus_id(ns.BusView.BUS_BREAKER) == bus_id
+        assert switch.get_bus_id(ns.BusView.BUS_BRANCH) == ''
+        assert switch in switch.voltage_level.get_bus_connections(ns.BusView.BUS_BREAKER, bus_id)
+        assert structure.get_connections_values([switch])[0].bus_breaker_bus_id == bus_id
+        disconnector = structure.get_connection('S1VL1_BBS_LD1_DISCONNECTOR', 1)
+        assert not structure.is_retained(disconnector)
+        assert disconnector.get_bus_id(ns.BusView.BUS_BREAKER) == ''
+
+    def test_bus_graph(self, setup):
+        network, structure = setup
+        graph = structure.get_bus_graph(ns.BusView.BUS_BRANCH)
+        assert len(graph) == len(structure.buses)
+        bus1 = structure.get_connection('TWT', 1).get_bus_id(ns.BusView.BUS_BRANCH)
+        bus2 = structure.get_connection('TWT', 2).get_bus_id(ns.BusView.BUS_BRANCH)
+        assert bus2 in graph.neighbours(bus1)
+        assert ('TWT', bus1) in graph.edges(bus2)
+        # HVDC lines link the buses of their converter stations
+        vsc1 = structure.get_connection('VSC1', None).get_bus_id(ns.BusView.BUS_BRANCH)
+        vsc2 = structure.get_connection('VSC2', None).get_bus_id(ns.BusView.BUS_BRANCH)
+        assert ('HVDC1', vsc2) in graph.edges(vsc1)
+        assert graph.degrees().sum() == 2 * graph.edge_count
+        assert structure.get_bus_graph(ns.BusView.BUS_BRANCH) is graph
+        # closed retained switches are edges of the bus/breaker view
+        bus_breaker_graph = structure.get_bus_graph(ns.BusView.BUS_BREAKER)
+        switch = structure.get_connection('S1VL1_LD1_BREAKER', 1)
+        switch_bus1 = switch.get_bus_id(ns.BusView.BUS_BREAKER)
+        switch_bus2 = structure.get_other_sides(switch)[0].get_bus_id(ns.BusView.BUS_BREAKER)
+        assert ('S1VL1_LD1_BREAKER', switch_bus2) in bus_breaker_graph.edges(switch_bus1)
+        network.update_switches(id='S1VL1_LD1_BREAKER', open=True)
+        structure.refresh()
+        assert structure.get_bus_graph(ns.BusView.BUS_BRANCH) is not graph
+        assert ('S1VL1_LD1_BREAKER', switch_bus2) not in \
+               structure.get_bus_graph(ns.BusView.BUS_BREAKER).edges(switch_bus1)
+
+    def test_search_index(self, setup):
+        network, structure = setup
+        search_index = structure.search_index
+        assert structure.search_index is search_index
+        # kept across refreshes, the equipments and their names do not change
+        lf.run_ac(network)
+        structure.refresh(results_only=True)
+        structure.refresh()
+        assert structure.search_index is search_index
+        # renamed equipments are searched by their new name
+        structure.load_tables(['loads'])
+        network.update_loads(id='LD1', name='Renamed load')
+        structure.update_value('loads', 'LD1', 'name', 'Renamed load')
+        structure.refresh(incremental=True)
+        assert structure.search_index is not search_index
+        assert [hit.object_id for hit in structure.search_index.hits('renamed')] == ['LD1']
+        search_index = structure.search_index
+        # same result as a plain case-insensitive substring scan
+        objects = [(s.substation_id, s.name) for s in structure.substations] + \
+                  [(vl.voltage_level_id, vl.name) for vl in structure.voltage_levels]
+        for query in ['', 's', 'Vl', 's1vl2_bbs', 'LD1', 'unknown']:
+            expected = [object_id for object_id, name in objects
+                        if query.lower() in object_id.lower() or query.lower() in name.lower()]
+            assert [hit.object_id for hit in search_index.hits(query)
+                    if hit.object_type in ['substation', 'voltage_level']] == expected
+        hits = search_index.hits('ld1')
+        assert [hit.object_id for hit in hits] == ['LD1', 'S1VL1_BBS_LD1_DISCONNECTOR', 'S1VL1_LD1_BREAKER']
+        assert hits[0].object_type == ns.EquipmentType.LOAD
+        assert hits[0].selection == ('voltage_level', 'S1VL1', structure.get_connection('LD1', None))
+        # equipments are found in all the voltage levels they connect
+        assert search_index.voltage_level_ids(search_index.search('twt')) == ['S1VL1', 'S1VL2']
+        assert search_index.hits('S2')[0].selection == ('substation', 'S2', None)
+        # narrowed to the result of a query contained in the new one
+        assert search_index.search('ld1', within=search_index.search('ld')).tolist() == \
+               search_index.search('ld1').tolist()
+        # candidates checked at the occurrences of the rarest trigram, or byte by byte when fewer
+        assert search_index.search('vl1', within=search_index.search('s1vl1')).tolist() == \
+               search_index.search('s1vl1').tolist()
+        assert search_index.search('vl1', within=search_index.search('s1vl1')[:1]).tolist() == \
+               search_index.search('s1vl1')[:1].tolist()
+        assert search_index.search('l', within=search_index.search('ld1')).tolist() == \
+               search_index.search('ld1').tolist()
+        assert search_index.search('2', within=search_index.search('ld')).tolist() == \
+               sorted(set(search_index.search('2')) & set(search_index.search('ld')))
+
+
+class TestSnapshotCache:
+
+    @pytest.fixture
+    def setup(self, tmp_path):
+        path = str(tmp_path / 'network.xiidm')
+        pn.create_four_substations_node_breaker_network().save(path)
+        cache = ns.SnapshotCache(str(tmp_path / 'snapshots'))
+        yield path, cache
+
+    def test_store_and_load(self, setup):
+        path, cache = setup
+        assert cache.load(path) is None
+        structure = ns.NetworkStructure(pn.load(path))
+        cache.store(path, structure)
+        # written to a temporary directory, then renamed
+        assert not [name for name in os.listdir(cache.directory) if name.endswith('.tmp')]
+        restored = cache.load(path)
+        assert restored is not None
+        for name in structure.table_names:
+            assert restored.is_table_loaded(name)
+            pd.testing.assert_frame_equal(restored.get_table(name), structure.get_table(name))
+        assert len(restored.connection_table) == len(structure.connection_table)
+        vl = restored.get_voltage_level('S1VL2')
+        assert vl.connections == restored.connection_table.get_connections(
+            restored.connection_table.voltage_level_rows(vl.index))
+        assert [c.equipment_id for c in vl.connections] == \
+               [c.equipment_id for c in structure.get_voltage_level('S1VL2').connections]
+
+    def test_compact_key(self, setup):
+        path, cache = setup
+        assert cache.compute_key(path, compact=True) != cache.compute_key(path)
+        cache.store(path, ns.NetworkStructure(pn.load(path), compact=True))
+        # a snapshot of compact tables is not restored when compact mode is off
+        assert cache.load(path) is None
+        restored = cache.load(path, compact=True, key=cache.compute_key(path, compact=True))
+        assert restored is not None and restored.compact
+        assert isinstance(restored.get_table('loads')['voltage_level_id'].dtype, pd.CategoricalDtype)
+
+    def test_invalidation_and_eviction(self, setup):
+        path, cache = setup
+        cache.store(path, ns.NetworkStructure(pn.load(path)))
+        assert cache.size_bytes > 0
+        cache.invalidate(path)
+        assert cache.load(path) is None
+        cache.store(path, ns.NetworkStructure(pn.load(path)))
+        # a modified file does not match its previous snapshot
+        network = pn.load(path)
+        network.update_loads(id='LD1', p0=1.0)
+        network.save(path)
+        assert cache.load(path) is None
+        cache.store(path, ns.NetworkStructure(pn.load(path)))
+        cache.max_bytes = cache.size_bytes - 1
+        assert cache.load(path) is not None
+        cache.max_bytes = 0
+        assert cache.size_bytes == 0
+        cache.clear()
+        assert cache.load(path) is None
@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+import time
+import tkinter as tk
+
+import pypowsybl.network as pn
+import pytest
+
+import yagat.frames.impl.tree_view as tree_view_module
+from yagat.app_context import AppContext
+from yagat.frames import TreeView
+
+
+def run_until(root: tk.Tk, condition, timeout: float = 10):
+    # the Tk thread polls the results of the search thread, it must be in its main loop to do so
+    deadline = time.monotonic() + timeout
+
+    def check():
+        if condition() or time.monotonic() > deadline:
+            root.quit()
+        else:
+            root.after(10, check)
+
+    root.after(10, check)
+    root.mainloop()
+    # remaining idle callbacks, such as the last reattached batches
+    root.update()
+
+
+def search(root: tk.Tk, tree_view: TreeView, query: str):
+    previous = tree_view.last_search
+    tree_view.search_var.set(query)
+    run_until(root, lambda: tree_view.last_search is not previous)
+    assert tree_view.last_search[0] == query.lower()
+
+
+def attached_tree(tree_view: TreeView) -> list[tuple[str, str, list[str]]]:
+    # attached top level nodes, with their attached voltage levels
+    tree = tree_view.tree
+    nodes = []
+    for node in tree.get_children(tree_view.tree_parent):
+        object_type, object_id = tree.item(node)['values']
+        voltage_level_ids = [str(tree.item(child)['values'][1]) for child in tree.get_children(node)
+                             if tree.item(child)['values'][0] == 'voltage_level']
+        nodes.append((object_type, str(object_id), voltage_level_ids))
+    return nodes
+
+
+def eager_tree(context: AppContext, query: str = '') -> list[tuple[str, str, list[str]]]:
+    # the tree as built in one pass by filtering all substations and voltage levels, see TreeView._get_included
+    network_structure = context.network_structure
+    search_index = network_structure.search_index
+    positions = search_index.search(query)
+    voltage_level_ids = set(search_index.voltage_level_ids(positions))
+    substation_ids = set(search_index.substation_ids(positions)) | \
+        {network_structure.get_voltage_level(voltage_level_id).substation.substation_id
+         for voltage_level_id in voltage_level_ids
+         if network_structure.get_voltage_level(voltage_level_id).substation}
+    nodes = [('substation', substation.substation_id,
+              [vl.voltage_level_id for vl in network_structure.voltage_levels
+               if vl.substation is substation and vl.voltage_level_id in voltage_level_ids])
+             for substation in network_structure.substations if substation.substation_id in substation_ids]
+    nodes.extend(('voltage_level', vl.voltage_level_id, []) for vl in network_structure.voltage_levels
+                 if not vl.substation and vl.voltage_level_id in voltage_level_ids)
+    return nodes
+
+
+class TestTreeView:
+
+    @pytest.fixture
+    def setup(self, monkeypatch):
+        # small chunks and batches, so that a small network goes through several of them
+        monkeypatch.setattr(tree_view_module, 'INSERT_CHUNK_SIZE', 2)
+        monkeypatch.setattr(tree_view_module, 'REATTACH_BATCH_SIZE', 2)
+        root = tk.Tk()
+        context = AppContext(root)
+        tree_view = TreeView(root, context)
+        yield root, context, tree_view
+        root.destroy()
+
+    def test_chunked_insertion(self, setup):
+        root, context, tree_view = setup
+        context.network = pn.create_four_substations_node_breaker_network()
+        # a first chunk right away, the others when idle
+        assert len(tree_view.tree.get_children(tree_view.tree_parent)) == 2
+        root.update()
+        assert tree_view.inserted_count == len(tree_view.top_level_objects)
+        assert attached_tree(tree_view) == eager_tree(context)
+
+    def test_lazy_population(self, setup, monkeypatch):
+        root, context, tree_view = setup
+        monkeypatch.setattr(tree_view_module, 'AUTO_OPEN_LIMIT', 0)
+        context.network = pn.create_four_substations_node_breaker_network()
+        root.update()
+        # substations are inserted with a placeholder child, their voltage levels on first open
+        assert not tree_view.populated_substations
+        assert all(voltage_level_ids == [] for _, _, voltage_level_ids in attached_tree(tree_view))
+        s1 = tree_view.selection_mapping['S1']
+        assert [tree_view.tree.item(child)['values'][0] for child in tree_view.tree.get_children(s1)] == \
+               ['placeholder']
+        tree_view.tree.focus(s1)
+        tree_view.on_tree_open(None)
+        assert tree_view.populated_substations == {'S1'}
+        assert attached_tree(tree_view)[0] == eager_tree(context)[0]
+        # voltage levels not inserted yet are inserted when selected
+        assert tree_view.get_node('S2VL1') == tree_view.selection_mapping['S2VL1']
+        assert 'S2' in tree_view.populated_substations
+
+    def test_search(self, setup):
+        root, context, tree_view = setup
+        context.network = pn.create_four_substations_node_breaker_network()
+        root.update()
+        expected = eager_tree(context)
+        # each search hides then reattaches nodes, narrowing extending queries
+        for query in ['S1', 'S1VL2', 'LD', 'unknown', '', 'S', 'S3', 'VL1', '']:
+            search(root, tree_view, query)
+            assert attached_tree(tree_view) == eager_tree(context, query)
+        assert attached_tree(tree_view) == expected
+
+    def test_search_before_insertion_done(self, setup, monkeypatch):
+        root, context, tree_view = setup
+        # no chunk inserted when idle: the search inserts the top level nodes before applying its result
+        monkeypatch.setattr(tree_view, 'insert_chunk', lambda top_level_objects: None)
+        context.network = pn.create_ieee14()
+        assert not tree_view.tree.get_children(tree_view.tree_parent)
+        search(root, tree_view, 'VL1')
+        assert attached_tree(tree_view) == eager_tree(context, 'VL1')
+        search(root, tree_view, '')
+        assert attached_tree(tree_view) == eager_tree(context)
@@ -10,6 +10,7 @@ import threading
 import tkinter as tk
 from typing import Callable, Optional
 
+import pandas as pd
 import pypowsybl.loadflow as lf
 import pypowsybl.network as pn
 
@@ -22,6 +23,12 @@ class AppContext:
         self._network: Optional[pn.Network] = None
         self._lf_parameters: lf.Parameters = lf.Parameters()
         self._network_structure: Optional[ns.NetworkStructure] = None
+        self._snapshot_cache: ns.SnapshotCache = ns.SnapshotCache()
+        self._compact_tables: bool = False
+        self._virtual_list_views: bool = False
+        self._reference_snapshot: Optional[dict[str, pd.DataFrame]] = None
+        # depth of the 'neighbourhood' selection type, in buses from the selected substation or voltage level
+        self._neighbourhood_depth: int = 1
         self._selection: tuple[Optional[str], Optional[str], Optional[ns.Connection]] = (None, None, None)
         self._status_text: str = 'Welcome'
         self._selected_tab_group: str = ''
@@ -34,6 +41,7 @@ class AppContext:
         self.tab_group_changed_listeners: list[Callable[[str], None]] = []
         self.tab_changed_listeners: list[Callable[[str], None]] = []
         self.view_changed_listeners: list[Callable[[str], None]] = []
+        self.rows_changed_listeners: list[Callable[[str, list[str]], None]] = []
         self._long_running_task: Optional[threading.Thread] = None
         self._network_changed_listener_enabled: bool = True
 
@@ -84,14 +92,54 @@ class AppContext:
 
     @network.setter
     def network(self, new_network: Optional[pn.Network]) -> None:
+        self.set_network(new_network)
+
+    def set_network(self, new_network: Optional[pn.Network],
+                    network_structure: Optional[ns.NetworkStructure] = None) -> None:
+        # network_structure: already built for new_network, e.g. restored from the snapshot cache
         self._network = new_network
         if new_network:
-            self._network_structure = ns.NetworkStructure(new_network)
+            self._network_structure = network_structure or ns.NetworkStructure(new_network,
+                                                                                compact=self._compact_tables)
+            self._network_structure.add_rows_changed_listener(self.notify_rows_changed)
         else:
             self._network_structure = None
+        self._reference_snapshot = None
         self.selection = (None, None, None)
         self.notify_network_changed()
 
+    @property
+    def compact_tables(self) -> bool:
+        return self._compact_tables
+
+    @compact_tables.setter
+    def compact_tables(self, value: bool) -> None:
+        # applies to networks opened afterwards
+        self._compact_tables = value
+
+    @property
+    def virtual_list_views(self) -> bool:
+        # large tables of the list views are read on demand instead of being copied to the sheets, off by default
+        return self._virtual_list_views
+
+    @virtual_list_views.setter
+    def virtual_list_views(self, value: bool) -> None:
+        self._virtual_list_views = value
+        self.notify_selection_changed()  # hack to trigger refresh
+
+    @property
+    def reference_snapshot(self) -> Optional[dict[str, pd.DataFrame]]:
+        # tables the Differences view compares the current network with
+        return self._reference_snapshot
+
+    @reference_snapshot.setter
+    def reference_snapshot(self, value: Optional[dict[str, pd.DataFrame]]) -> None:
+        self._reference_snapshot = value
+
+    @property
+    def snapshot_cache(self) -> ns.SnapshotCache:
+        return self._snapshot_cache
+
     @property
     def lf_parameters(self) -> lf.Parameters:
         return self._lf_parameters
@@ -100,6 +148,14 @@ class AppContext:
     def network_structure(self) -> Optional[ns.NetworkStructure]:
         return self._network_structure
 
+    @property
+    def neighbourhood_depth(self) -> int:
+        return self._neighbourhood_depth
+
+    @neighbourhood_depth.setter
+    def neighbourhood_depth(self, value: int) -> None:
+        self._neighbourhood_depth = value
+
     @property
     def selection(self) -> tuple[Optional[str], Optional[str], Optional[ns.Connection]]:
         return self._selection
@@ -159,6 +215,13 @@ class AppContext:
         for listener in self.view_changed_listeners:
             listener(self.selected_view)
 
+    def add_rows_changed_listener(self, listener: Callable[[str, list[str]], None]) -> None:
+        self.rows_changed_listeners.append(listener)
+
+    def notify_rows_changed(self, table_name: str, ids: list[str]) -> None:
+        for listener in self.rows_changed_listeners:
+            listener(table_name, ids)
+
     @property
     def network_changed_listener_enabled(self) -> bool:
         return self._network_changed_listener_enabled
@@ -26,6 +26,10 @@ class AreaListView(BaseListView):
     def tab_group_name(self) -> str:
         return 'Areas List'
 
+    @property
+    def table_name(self) -> str:
+        return 'areas'
+
     def get_data_frame(self) -> pd.DataFrame:
         return self.context.network_structure.areas
 
@@ -34,7 +38,7 @@ class AreaListView(BaseListView):
 
     def on_entry(self, ident: str, column_name: str, new_value: Any):
         self.context.network.update_areas(**{'id': ident, column_name: new_value})
-        self.context.network_structure.areas.loc[ident, column_name] = new_value
+        self.context.network_structure.update_value(self.table_name, ident, column_name, new_value)
 
     def filter_data_frame(self, df: pd.DataFrame, voltage_levels: list[str]) -> pd.DataFrame:
         return df
@@ -12,11 +12,15 @@ from typing import Optional, Any
 
 import pandas as pd
 import tksheet as tks
-from tksheet import num2alpha, float_formatter, int_formatter
+from tksheet import num2alpha, float_formatter, int_formatter, float_to_str
 
 from yagat.app_context import AppContext
+from yagat.frames.impl.data_frame_rows import DataFrameRows, to_python
 from yagat.networkstructure import Connection
 
+# tables with more rows are shown through a DataFrameRows provider, without copying them to python lists
+VIRTUAL_ROWS_THRESHOLD = 5000
+
 
 class BaseColumnFormat(ABC):
 
@@ -32,6 +36,14 @@ class BaseColumnFormat(ABC):
     def editable(self) -> bool:
         return self._editable
 
+    def to_display(self, value: Any) -> Any:
+        # cell value as shown by the sheet when the column formatter is not applied to the data (DataFrameRows)
+        return to_python(value)
+
+    def parse(self, value: Any) -> Any:
+        # edited value, typed text when the column formatter is not applied to the data (DataFrameRows)
+        return value
+
 
 class StringColumnFormat(BaseColumnFormat):
 
@@ -51,6 +63,12 @@ class IntegerColumnFormat(BaseColumnFormat):
     def __init__(self, column_name: str, editable: bool = False):
         BaseColumnFormat.__init__(self, column_name, editable)
 
+    def to_display(self, value: Any) -> Any:
+        return int(value)
+
+    def parse(self, value: Any) -> Any:
+        return int(float(value)) if isinstance(value, str) else value
+
 
 class DoubleColumnFormat(BaseColumnFormat):
 
@@ -62,12 +80,21 @@ class DoubleColumnFormat(BaseColumnFormat):
     def precision(self) -> int:
         return self._precision
 
+    def to_display(self, value: Any) -> Any:
+        return float_to_str(float(value), decimals=self._precision)
+
+    def parse(self, value: Any) -> Any:
+        return float(value) if isinstance(value, str) else value
+
 
 class BooleanColumnFormat(BaseColumnFormat):
 
     def __init__(self, column_name: str, editable: bool = False):
         BaseColumnFormat.__init__(self, column_name, editable)
 
+    def to_display(self, value: Any) -> Any:
+        return bool(value)
+
 
 PRECISION_POWER = 1
 PRECISION_CURRENT = 1
@@ -125,12 +152,14 @@ COLUMN_FORMATS = {
     'voltage_regulator_on': BooleanColumnFormat('voltage_regulator_on', editable=True),
     'voltage_regulation_on': BooleanColumnFormat('voltage_regulation_on', editable=True),
     'section_count': IntegerColumnFormat('section_count', editable=True),
+    'shunt_type': StringColumnFormat('shunt_type'),
     'interchange_target': DoubleColumnFormat('interchange_target', precision=PRECISION_POWER, editable=True),
     'interchange': DoubleColumnFormat('interchange', precision=PRECISION_POWER),
     'ac_interchange': DoubleColumnFormat('ac_interchange', precision=PRECISION_POWER),
     'dc_interchange': DoubleColumnFormat('dc_interchange', precision=PRECISION_POWER),
     'ac': BooleanColumnFormat('ac'),
     'iteration_count': IntegerColumnFormat('iteration_count'),
+    'bus_count': IntegerColumnFormat('bus_count'),
     'active_power_mismatch': DoubleColumnFormat('active_power_mismatch', precision=PRECISION_POWER),
     'distributed_active_power': DoubleColumnFormat('distributed_active_power', precision=PRECISION_POWER),
 }
@@ -140,13 +169,31 @@ class BaseListView(tk.Frame, ABC):
 
     def sheet_modified(self, event):
         if event.eventname == 'edit_table':
-            row = event.selected.row
-            column = event.selected.column
-            new_value = self.sheet[row, column].data
-            ident = self.sheet.get_index_data(row)
-            column_name = self.sheet.get_header_data(column)
-            logging.info(f'updating "{ident}": {column_name} set to {new_value}')
-            self.on_entry(ident=ident, column_name=column_name, new_value=new_value)
+            # a single cell edit, or all the cells of a paste
+            for row, column in event.cells.table:
+                new_value = self.sheet[row, column].data
+                ident = self.sheet.get_index_data(row)
+                column_name = self.sheet.get_header_data(column)
+                column_format = self.get_column_formats().get(column_name)
+                if column_format:
+                    new_value = column_format.parse(new_value)
+                logging.info(f'updating "{ident}": {column_name} set to {new_value}')
+                self.on_entry(ident=ident, column_name=column_name, new_value=new_value)
+            if not self._refresh_pending:
+                # edits made before the UI is idle again are refreshed at once
+                self._refresh_pending = True
+                self.after_idle(self.refresh_edited_rows)
+
+    def refresh_edited_rows(self):
+        self._refresh_pending = False
+        network_structure = self.context.network_structure
+        if not network_structure:
+            return
+        # re-reads the edited rows, subscribed views are then notified through on_rows_changed
+        generation = network_structure.generation
+        network_structure.refresh(incremental=True)
+        if network_structure.generation != generation:
+            self.context.notify_selection_changed()  # full refresh, reload all views
 
     def __init__(self, parent, context: AppContext, *args, **kwargs):
         tk.Frame.__init__(self, parent, *args, **kwargs)
@@ -165,8 +212,15 @@ class BaseListView(tk.Frame, ABC):
                                    )
         self.sheet.bind("<<SheetModified>>", self.sheet_modified)
         self.context = context
+        # sheet row of each displayed id
+        self._row_positions: dict[str, int] = {}
+        # data of the sheet for large tables, None when copied to python lists
+        self._rows: Optional[DataFrameRows] = None
+        # an incremental refresh of the edited rows is scheduled for when the UI is idle
+        self._refresh_pending = False
         self.context.add_selection_changed_listener(self.on_selection_changed)
         self.context.add_tab_changed_listener(lambda _: self.on_selection_changed(self.context.selection))
+        self.context.add_rows_changed_listener(self.on_rows_changed)
 
         self.sheet.set_index_width(300)
         self.sheet.pack(fill="both", expand=True)
@@ -181,6 +235,11 @@ class BaseListView(tk.Frame, ABC):
     def tab_group_name(self) -> str:
         return 'tab group name'
 
+    @property
+    def table_name(self) -> Optional[str]:
+        # network structure table edited by on_entry, None if not editable
+        return None
+
     @abstractmethod
     def get_data_frame(self) -> pd.DataFrame:
         raise NotImplementedError
@@ -201,16 +260,39 @@ class BaseListView(tk.Frame, ABC):
         if self.context.selected_tab != self.tab_name:
             return
         self.sheet.reset()
+        self._row_positions = {}
+        self._rows = None
         if not self.context.network_structure:
             return
         df = self.get_data_frame()
         voltage_levels = self.filtered_voltage_levels(selection)
         if voltage_levels:
             df = self.filter_data_frame(df, voltage_levels)
-        self.sheet.data = [l.tolist() for l in df.to_numpy()]
+        if self.context.virtual_list_views and len(df) > VIRTUAL_ROWS_THRESHOLD:
+            column_formats = self.get_column_formats()
+            self._rows = DataFrameRows(df, [column_formats.get(column, BaseColumnFormat(column)).to_display
+                                            for column in df.columns])
+            # no formatting to apply yet, column formats below only set options: data is never copied
+            self.sheet.set_sheet_data(self._rows, keep_formatting=False, redraw=False)
+        else:
+            self.sheet.data = [l.tolist() for l in df.to_numpy()]
         self.sheet.set_index_data(df.index.tolist())
         self.sheet.set_header_data(df.columns)
         self._format_columns(df)
+        self._row_positions = {ident: position for position, ident in enumerate(df.index)}
+
+    def on_rows_changed(self, table_name: str, ids: list[str]):
+        if table_name != self.table_name or self.context.selected_tab != self.tab_name:
+            return
+        displayed = [ident for ident in ids if ident in self._row_positions]
+        if not displayed:
+            return
+        for ident, values in zip(displayed, self.get_data_frame().loc[displayed].to_numpy()):
+            if self._rows is not None:
+                self._rows.set_row(self._row_positions[ident], values)
+            else:
+                self.sheet.set_row_data(self._row_positions[ident], values=values.tolist(), redraw=False)
+        self.sheet.redraw()
 
     def _format_columns(self, df):
         column_formats = self.get_column_formats()
@@ -221,6 +303,13 @@ class BaseListView(tk.Frame, ABC):
                 continue
             col_format = column_formats[column_name]
             col.readonly(readonly=not col_format.editable)
+            if self._rows is not None:
+                # values are converted by the DataFrameRows when read, only the cell widgets are needed
+                if isinstance(col_format, StringColumnFormat) and col_format.possible_values:
+                    col.dropdown(values=col_format.possible_values, edit_data=False)
+                elif isinstance(col_format, BooleanColumnFormat):
+                    col.checkbox(state='normal' if col_format.editable else 'disabled', edit_data=False)
+                continue
             if isinstance(col_format, StringColumnFormat):
                 if col_format.possible_values:
                     col.dropdown(values=col_format.possible_values, set_values=dict(
@@ -244,4 +333,7 @@ class BaseListView(tk.Frame, ABC):
         elif selection[0] == 'substation':
             voltage_levels = [vl.voltage_level_id for vl in
                               self.context.network_structure.get_substation(selection[1]).voltage_levels]
+        elif selection[0] == 'neighbourhood':
+            voltage_levels = self.context.network_structure.get_neighbourhood_voltage_levels(
+                selection[1], self.context.neighbourhood_depth)
         return voltage_levels
@@ -29,6 +29,10 @@ class BusesListView(BaseListView):
     def tab_group_name(self) -> str:
         return 'Buses List'
 
+    @property
+    def table_name(self) -> str:
+        return 'buses'
+
     def get_data_frame(self) -> pd.DataFrame:
         return self.context.network_structure.buses
 
@@ -37,7 +41,7 @@ class BusesListView(BaseListView):
 
     def on_entry(self, ident: str, column_name: str, new_value: Any):
         self.context.network.update_buses(**{'id': ident, column_name: new_value})
-        self.context.network_structure.buses.loc[ident, column_name] = new_value
+        self.context.network_structure.update_value(self.table_name, ident, column_name, new_value)
 
     def filter_data_frame(self, df: pd.DataFrame, voltage_levels: list[str]) -> pd.DataFrame:
         return df.loc[df['voltage_level_id'].isin(voltage_levels)]
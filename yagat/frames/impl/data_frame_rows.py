@@ -0,0 +1,215 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+
+# marks cells not written by the sheet
+_NOT_WRITTEN = object()
+
+
+def to_python(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _not_supported(name: str) -> Callable:
+    # list methods that would otherwise act on the empty storage of the list subclasses below
+    def method(self, *args, **kwargs):
+        raise TypeError(f'{type(self).__name__} is a fixed size view of a DataFrame, {name} is not supported')
+
+    method.__name__ = name
+    return method
+
+
+# Sheet data provider over a DataFrame: tksheet reads it as a list of rows, but rows are views created on access
+# and cells are read from the DataFrame column arrays, so only the visible cells are converted to python objects.
+# Cells written by the sheet (edits, refreshed rows) are kept aside, the DataFrame is never modified.
+class DataFrameRows(list):
+
+    def __init__(self, df: pd.DataFrame, to_display: List[Callable[[Any], Any]]):
+        super().__init__()
+        self._columns: List[np.ndarray] = [df.iloc[:, position].to_numpy() for position in range(df.shape[1])]
+        self._to_display = to_display
+        self._row_count = len(df)
+        self._written: Dict[tuple[int, int], Any] = {}
+
+    @property
+    def column_count(self) -> int:
+        return len(self._columns)
+
+    def get_cell(self, row: int, column: int) -> Any:
+        value = self._written.get((row, column), _NOT_WRITTEN)
+        if value is _NOT_WRITTEN:
+            value = self._columns[column][row]
+        try:
+            return self._to_display[column](value)
+        except (TypeError, ValueError):
+            # edited text not valid for the column, shown as typed
+            return to_python(value)
+
+    def set_cell(self, row: int, column: int, value: Any) -> None:
+        self._written[(row, column)] = value
+
+    def set_row(self, row: int, values: Iterable[Any]) -> None:
+        for column, value in enumerate(values):
+            self.set_cell(row, column, value)
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def __bool__(self) -> bool:
+        return self._row_count > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [DataFrameRow(self, row) for row in range(*index.indices(self._row_count))]
+        if index < 0:
+            index += self._row_count
+        if not 0 <= index < self._row_count:
+            raise IndexError('row index out of range')
+        return DataFrameRow(self, index)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            # the sheet truncates its data to the displayed row count, which never changes here
+            if len(range(*index.indices(self._row_count))) or list(value):
+                raise TypeError('DataFrameRows is a fixed size view of a DataFrame, rows cannot be replaced')
+            return
+        self.set_row(index, value)
+
+    def __iter__(self) -> Iterator['DataFrameRow']:
+        return (DataFrameRow(self, row) for row in range(self._row_count))
+
+    def __reversed__(self) -> Iterator['DataFrameRow']:
+        return (DataFrameRow(self, row) for row in reversed(range(self._row_count)))
+
+    def __contains__(self, row) -> bool:
+        return any(row == other for other in self)
+
+    def extend(self, rows: Iterable) -> None:
+        # the sheet pads its data with empty rows up to the index length, which is the row count here
+        if any(True for _ in rows):
+            raise TypeError('DataFrameRows is a fixed size view of a DataFrame, rows cannot be added')
+
+    def copy(self) -> list:
+        # displayed values as a list of lists
+        return [row.copy() for row in self]
+
+    def index(self, row, *args) -> int:
+        return self.copy().index(row, *args)
+
+    def count(self, row) -> int:
+        return sum(1 for other in self if other == row)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, list) and len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    append = _not_supported('append')
+    insert = _not_supported('insert')
+    pop = _not_supported('pop')
+    remove = _not_supported('remove')
+    clear = _not_supported('clear')
+    sort = _not_supported('sort')
+    reverse = _not_supported('reverse')
+    __delitem__ = _not_supported('__delitem__')
+    __iadd__ = _not_supported('__iadd__')
+    __imul__ = _not_supported('__imul__')
+    __add__ = _not_supported('__add__')
+    __mul__ = _not_supported('__mul__')
+    __rmul__ = _not_supported('__rmul__')
+
+    def __repr__(self) -> str:
+        return f'DataFrameRows({self._row_count} rows, {self.column_count} columns)'
+
+
+class DataFrameRow(list):
+    __slots__ = ('_rows', '_row')
+
+    def __init__(self, rows: DataFrameRows, row: int):
+        super().__init__()
+        self._rows = rows
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._rows.column_count
+
+    def __bool__(self) -> bool:
+        return self._rows.column_count > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._rows.get_cell(self._row, column) for column in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('column index out of range')
+        return self._rows.get_cell(self._row, index)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            raise TypeError('DataFrameRow is a fixed size view of a DataFrame, cells cannot be replaced')
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('column index out of range')
+        self._rows.set_cell(self._row, index, value)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self._rows.get_cell(self._row, column) for column in range(len(self)))
+
+    def __reversed__(self) -> Iterator[Any]:
+        return (self._rows.get_cell(self._row, column) for column in reversed(range(len(self))))
+
+    def __contains__(self, value) -> bool:
+        return any(value == cell for cell in self)
+
+    def extend(self, values: Iterable) -> None:
+        # the sheet pads its rows with empty cells up to the column count, which is the column count here
+        if any(True for _ in values):
+            raise TypeError('DataFrameRow is a fixed size view of a DataFrame, cells cannot be added')
+
+    def copy(self) -> list:
+        return list(self)
+
+    def index(self, value, *args) -> int:
+        return self.copy().index(value, *args)
+
+    def count(self, value) -> int:
+        return self.copy().count(value)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, list) and self.copy() == list(other)
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    def __add__(self, other) -> list:
+        return self.copy() + other
+
+    append = _not_supported('append')
+    insert = _not_supported('insert')
+    pop = _not_supported('pop')
+    remove = _not_supported('remove')
+    clear = _not_supported('clear')
+    sort = _not_supported('sort')
+    reverse = _not_supported('reverse')
+    __delitem__ = _not_supported('__delitem__')
+    __iadd__ = _not_supported('__iadd__')
+    __imul__ = _not_supported('__imul__')
+    __mul__ = _not_supported('__mul__')
+    __rmul__ = _not_supported('__rmul__')
+
+    def __repr__(self) -> str:
+        return repr(list(self))
@@ -58,7 +58,8 @@ class DiagramViewBus(VerticalScrolledFrame):
         for w in self.widgets:
             w.destroy()
         self.widgets = []
-        if selection_type not in ['substation', 'voltage_level']:
+        # the neighbourhood of a substation or voltage level is filtered in list views, the root is drawn here
+        if selection_type not in ['substation', 'voltage_level', 'neighbourhood']:
             return
         if not selection_id:
             return
@@ -96,8 +97,9 @@ class DiagramViewBus(VerticalScrolledFrame):
                 b.pack(anchor=tk.NW, padx=(40, 0), pady=(pady_bus, 0))
                 pady_bus = 20
                 connections = voltage_level.get_bus_connections(self.bus_view, bus_id)
-                for connection in connections:
-                    c = pw.Connection(self.interior, connection, self.navigate_command)
+                connections_values = network_structure.get_connections_values(connections)
+                for connection, values in zip(connections, connections_values):
+                    c = pw.Connection(self.interior, connection, self.navigate_command, values)
                     self.widgets.append(c)
                     c.pack(anchor=tk.NW, padx=(60, 0))
                     if connection == selection_connection:
@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+import os
+import tkinter as tk
+from typing import Any, Optional
+
+import pandas as pd
+import pypowsybl.network as pn
+
+import yagat.networkstructure as ns
+from yagat.app_context import AppContext
+from yagat.frames.impl.base_list_view import BaseListView, BaseColumnFormat, DoubleColumnFormat, \
+    StringColumnFormat, COLUMN_FORMATS
+
+DIFF_VALUE_COLUMNS = ['before', 'after', 'delta']
+DIFF_COLUMN_FORMATS = {
+    'table': StringColumnFormat('table'),
+    'change': StringColumnFormat('change'),
+    'column': StringColumnFormat('column'),
+}
+
+
+class DiffListView(BaseListView):
+
+    def __init__(self, parent, context: AppContext, *args, **kwargs):
+        BaseListView.__init__(self, parent, context, *args, **kwargs)
+        # last computed differences, with the network structure, reference snapshot and data version they match
+        self._diff: Optional[tuple[ns.NetworkStructure, dict[str, pd.DataFrame], int, pd.DataFrame]] = None
+
+    @property
+    def tab_name(self) -> str:
+        return 'Differences'
+
+    @property
+    def tab_group_name(self) -> str:
+        return 'Differences'
+
+    def get_data_frame(self) -> pd.DataFrame:
+        reference_snapshot = self.context.reference_snapshot
+        if reference_snapshot is None:
+            return ns.empty_diff()
+        network_structure = self.context.network_structure
+        if self._diff is not None:
+            diff_network_structure, diff_reference_snapshot, data_version, df = self._diff
+            if diff_network_structure is network_structure and diff_reference_snapshot is reference_snapshot \
+                    and data_version == network_structure.data_version:
+                return df
+        data_version = network_structure.data_version
+        df = self.__compute_diff(network_structure, reference_snapshot)
+        self._diff = (network_structure, reference_snapshot, data_version, df)
+        return df
+
+    @staticmethod
+    def __compute_diff(network_structure: ns.NetworkStructure,
+                       reference_snapshot: dict[str, pd.DataFrame]) -> pd.DataFrame:
+        # values compared with the precision of their column in the other list views, and shown with its format
+        tolerances = {column: 0.5 * 10 ** -column_format.precision for column, column_format in COLUMN_FORMATS.items()
+                      if isinstance(column_format, DoubleColumnFormat)}
+        df = network_structure.diff(reference_snapshot, tolerances)
+        df['delta'] = df['delta'].astype(object)
+        for column, positions in df.groupby('column', sort=False).indices.items():
+            column_format = COLUMN_FORMATS.get(column)
+            if not isinstance(column_format, DoubleColumnFormat):
+                continue
+            for value_column in DIFF_VALUE_COLUMNS:
+                values = df[value_column].iloc[positions]
+                df.iloc[positions, df.columns.get_loc(value_column)] = \
+                    [column_format.to_display(value) if pd.notna(value) else None for value in values]
+        return df
+
+    def get_column_formats(self) -> dict[str, BaseColumnFormat]:
+        # before, after and delta are formatted row by row with the format of the changed column
+        return DIFF_COLUMN_FORMATS
+
+    def on_entry(self, ident: str, column_name: str, new_value: Any):
+        raise RuntimeError('Differences do not support update')
+
+    def filter_data_frame(self, df: pd.DataFrame, voltage_levels: list[str]) -> pd.DataFrame:
+        # equipments connected to the voltage levels and their buses
+        network_structure = self.context.network_structure
+        connection_table = network_structure.connection_table
+        ids = list(voltage_levels)
+        for vl_id in voltage_levels:
+            vl = network_structure.get_voltage_level(vl_id)
+            ids.extend(connection_table.equipment_ids[connection_table.voltage_level_rows(vl.index)])
+            for bus_view in ns.BusView:
+                ids.extend(vl.get_buses(bus_view).index)
+        return df.loc[df.index.isin(ids)]
+
+
+if __name__ == "__main__":
+
+    if os.name == 'nt':
+        # Fixing the blur UI on Windows
+        from ctypes import windll
+
+        windll.shcore.SetProcessDpiAwareness(2)
+    root = tk.Tk()
+    ctx = AppContext(root)
+    bw = DiffListView(root, ctx)
+    bw.pack(fill="both", expand=True)
+    ctx.network = pn.create_ieee14()
+    ctx.reference_snapshot = ctx.network_structure.snapshot()
+    ctx.network.update_loads(id='B3-L', p0=100)
+    ctx.network_structure.refresh()
+    ctx.selection = ('network', '', None)
+    ctx.selected_tab = bw.tab_name
+    root.mainloop()
@@ -29,6 +29,10 @@ class ShuntCompensatorListView(BaseListView):
     def tab_group_name(self) -> str:
         return 'Shunt Compensators List'
 
+    @property
+    def table_name(self) -> str:
+        return 'shunt_compensators'
+
     def get_data_frame(self) -> pd.DataFrame:
         return self.context.network_structure.shunt_compensators
 
@@ -37,7 +41,7 @@ class ShuntCompensatorListView(BaseListView):
 
     def on_entry(self, ident: str, column_name: str, new_value: Any):
         self.context.network.update_shunt_compensators(**{'id': ident, column_name: new_value})
-        self.context.network_structure.shunt_compensators.loc[ident, column_name] = new_value
+        self.context.network_structure.update_value(self.table_name, ident, column_name, new_value)
 
     def filter_data_frame(self, df: pd.DataFrame, voltage_levels: list[str]) -> pd.DataFrame:
         return df.loc[df['voltage_level_id'].isin(voltage_levels)]
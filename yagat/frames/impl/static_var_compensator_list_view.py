@@ -29,6 +29,10 @@ class StaticVarCompensatorListView(BaseListView):
     def tab_group_name(self) -> str:
         return 'Static VAR Compensators List'
 
+    @property
+    def table_name(self) -> str:
+        return 'static_var_compensators'
+
     def get_data_frame(self) -> pd.DataFrame:
         return self.context.network_structure.static_var_compensators
 
@@ -40,7 +44,7 @@ class StaticVarCompensatorListView(BaseListView):
 
     def on_entry(self, ident: str, column_name: str, new_value: Any):
         self.context.network.update_static_var_compensators(**{'id': ident, column_name: new_value})
-        self.context.network_structure.static_var_compensators.loc[ident, column_name] = new_value
+        self.context.network_structure.update_value(self.table_name, ident, column_name, new_value)
 
     def filter_data_frame(self, df: pd.DataFrame, voltage_levels: list[str]) -> pd.DataFrame:
         return df.loc[df['voltage_level_id'].isin(voltage_levels)]
@@ -15,6 +15,7 @@ from yagat.frames.impl.area_boundaries_list_view import AreaBoundariesListView
 from yagat.frames.impl.area_list_view import AreaListView
 from yagat.frames.impl.components_list_view import ComponentsListView
 from yagat.frames.impl.diagram_view_bus import DiagramViewBus
+from yagat.frames.impl.diff_list_view import DiffListView
 from yagat.frames.impl.buses_bus_view_list_view import BusesListView
 from yagat.frames.impl.buses_bus_breaker_view_list_view import BusesBusBreakerViewListView
 from yagat.frames.impl.generator_list_view import GeneratorListView
@@ -62,6 +63,7 @@ class TabsView(tk.Frame):
         self._add_tab(AreaListView(self.tab_control, self.context))
         self._add_tab(AreaBoundariesListView(self.tab_control, self.context))
         self._add_tab(ComponentsListView(self.tab_control, self.context))
+        self._add_tab(DiffListView(self.tab_control, self.context))
 
         self.tab_control.pack(expand=True, fill=tk.BOTH)
 
@@ -29,6 +29,10 @@ class ThreeWindingsTransformerListView(BaseListView):
     def tab_group_name(self) -> str:
         return 'Transformers List'
 
+    @property
+    def table_name(self) -> str:
+        return 'three_windings_transformers'
+
     def get_data_frame(self) -> pd.DataFrame:
         return self.context.network_structure.three_windings_transformers
 
@@ -37,7 +41,7 @@ class ThreeWindingsTransformerListView(BaseListView):
 
     def on_entry(self, ident: str, column_name: str, new_value: Any):
         self.context.network.update_3_windings_transformers(**{'id': ident, column_name: new_value})
-        self.context.network_structure.three_windings_transformers.loc[ident, column_name] = new_value
+        self.context.network_structure.update_value(self.table_name, ident, column_name, new_value)
 
     def filter_data_frame(self, df: pd.DataFrame, voltage_levels: list[str]) -> pd.DataFrame:
         return df.loc[df['voltage_level1_id'].isin(voltage_levels) | df['voltage_level2_id'].isin(voltage_levels) | df['voltage_level3_id'].isin(voltage_levels)]
@@ -6,16 +6,28 @@
 # SPDX-License-Identifier: MPL-2.0
 #
 import logging
+import queue
 import threading
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict, Union, Optional
+from typing import Dict, List, Union, Optional
 
+import numpy as np
 import pypowsybl.network as pn
 
 import yagat.networkstructure as ns
 from yagat.app_context import AppContext
 
+NEIGHBOURHOOD_DEPTHS = [1, 2, 3, 5, 10]
+# top level nodes inserted per idle callback when a network is opened
+INSERT_CHUNK_SIZE = 500
+# nodes reattached per idle callback when a search result is applied
+REATTACH_BATCH_SIZE = 1000
+# substations opened up front on small networks, and on searches matching their voltage levels, up to this count
+AUTO_OPEN_LIMIT = 100
+# delay between checks of the search results, while searches are running
+SEARCH_POLL_DELAY_MS = 20
+
 
 class TreeView(tk.Frame):
     def __init__(self, parent, context: AppContext, *args, **kwargs):
@@ -26,6 +38,7 @@ class TreeView(tk.Frame):
         self.search_var.trace_add(mode='write', callback=lambda _1, _2, _3: self.on_search())
         self.search = ttk.Entry(self, textvariable=self.search_var)
         self.search.pack(side=tk.TOP, fill=tk.X)
+        self.search.bind('<Return>', self.on_search_return)
 
         # show='tree' => will not show header
         # selectmode='browse' => single item
@@ -34,15 +47,39 @@ class TreeView(tk.Frame):
         self.tree_parent = None
         self.nodes_mapping: Dict[Union['ns.Substation', 'ns.VoltageLevel'], str] = {}
         self.selection_mapping: Dict[str, str] = {}
+        # substations and voltage levels without substation, inserted by chunks up to inserted_count
+        self.top_level_objects: List[Union['ns.Substation', 'ns.VoltageLevel']] = []
+        self.inserted_count = 0
+        # voltage levels of a substation are inserted when its node is first opened
+        self.substation_voltage_levels: Dict[str, List['ns.VoltageLevel']] = {}
+        self.populated_substations: set[str] = set()
+        # substations and voltage levels of the applied search, None when not filtered
+        self.included: Optional[tuple[set, set]] = None
 
         self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscrollcommand=self.scrollbar.set)
         self.scrollbar.pack(side=tk.LEFT, fill=tk.Y)
         context.add_network_changed_listener(self.on_network_changed)
         self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
+
+        # right click on a substation or voltage level: filter list views on its neighbourhood
+        self.popup_menu = tk.Menu(self, tearoff=0)
+        for depth in NEIGHBOURHOOD_DEPTHS:
+            self.popup_menu.add_command(label=f'Neighbourhood of depth {depth}',
+                                        command=lambda d=depth: self.select_neighbourhood(d))
+        self.popup_menu.add_separator()
+        self.popup_menu.add_command(label='Selection only', command=self.select_popup_item)
+        self.popup_item_values = None
+        self.tree.bind('<Button-3>', self.on_popup)
 
-        self.search_thread = None
-        self.search_pending = False
+        # incremented on each keystroke and network change: results of older searches are dropped
+        self.search_generation = 0
+        # (generation, result or None when abandoned) put by the search threads, polled by the Tk thread
+        self.search_results: queue.Queue[tuple[int, Optional[tuple[str, np.ndarray, set, set]]]] = queue.Queue()
+        self.running_searches = 0
+        # query and search index positions of the last applied search, narrowed by queries containing it
+        self.last_search: Optional[tuple[str, np.ndarray]] = None
         self.context.add_selection_changed_listener(self.on_selection_changed)
 
     def on_selection_changed(self, selection: tuple[Optional[str], Optional[str], Optional[ns.Connection]]):
@@ -55,105 +92,253 @@ class TreeView(tk.Frame):
         if tree_selection and tree_selection[0] != '':
             existing_selection = tree_selection[0][1]
         if selection_id != existing_selection:
-            node = self.selection_mapping[selection_id]
+            node = self.get_node(selection_id)
+            if node is None:
+                return
             self.tree.focus(node)
             self.tree.selection_set(node)
             self.tree.see(node)
 
     def on_search(self):
-        if self.search_thread is not None:
-            self.search_pending = True
+        self.search_generation += 1
+        if not self.tree_parent:
             return
-        to_reattach = []
-        self.search_thread = threading.Thread(target=self.on_search_background, args=(to_reattach,))
-        self.search_thread.start()
-
-        def schedule_check(t):
-            self.after(200, check_if_done, t)
-
-        def check_if_done(t):
-            if not t.is_alive():
-                logging.info("Updating tree view...")
-                self._detach_all()
-                for item, parent, index in to_reattach:
-                    self.tree.reattach(item, parent, index)
-                logging.info("Done updating tree view")
-                self.search_thread = None
-                if self.search_pending:
-                    self.search_pending = False
-                    self.on_search()
-            else:
-                schedule_check(t)
+        to_search = self.search_var.get().lower()
+        within = None
+        if self.last_search and self.last_search[0] in to_search:
+            within = self.last_search[1]
+        # built on the Tk thread on first use, with the lazy tables it needs: searches only read it
+        search_index = self.context.network_structure.search_index
+        threading.Thread(target=self.on_search_background,
+                         args=(self.search_generation, search_index, to_search, within), daemon=True).start()
+        self.running_searches += 1
+        if self.running_searches == 1:
+            self.after(SEARCH_POLL_DELAY_MS, self.poll_search_results)
+
+    def poll_search_results(self):
+        # on the Tk thread: search threads make no Tk call, they only put their results in the queue
+        result = None
+        while not self.search_results.empty():
+            generation, generation_result = self.search_results.get()
+            self.running_searches -= 1
+            if generation == self.search_generation and generation_result is not None:
+                result = (generation, generation_result)
+        if result is not None:
+            self.after_idle(self.on_search_done, *result)
+        if self.running_searches:
+            self.after(SEARCH_POLL_DELAY_MS, self.poll_search_results)
+
+    def on_search_done(self, generation: int, result: tuple[str, np.ndarray, set, set]):
+        if generation != self.search_generation:
+            return
+        to_search, positions, included_substations, included_voltage_levels = result
+        logging.info("Updating tree view...")
+        # the filter applies to the whole top level
+        self.insert_remaining()
+        self.included = (included_substations, included_voltage_levels) if to_search else None
+        to_detach, to_reattach = self.get_children_changes(
+            self.tree_parent, [self.nodes_mapping[o] for o in self.top_level_objects if self.is_included(o)])
+        for substation_id in self.populated_substations:
+            substation_to_detach, substation_to_reattach = self.get_children_changes(
+                self.selection_mapping[substation_id],
+                [self.nodes_mapping[vl] for vl in self.substation_voltage_levels[substation_id] if self.is_included(vl)])
+            to_detach.extend(substation_to_detach)
+            to_reattach.extend(substation_to_reattach)
+        if self.included is not None:
+            opened = {vl.substation for vl in included_voltage_levels if vl.substation}
+            if len(opened) <= AUTO_OPEN_LIMIT:
+                for substation in opened:
+                    self.populate(substation)
+                    self.tree.item(self.nodes_mapping[substation], open=True)
+        scroll_position = self.tree.yview()[0]
+        if to_detach:
+            self.tree.detach(*to_detach)
+        logging.info(f'Updating tree view: {len(to_detach)} nodes detached, {len(to_reattach)} to reattach')
+        self.reattach_batch(self.search_generation, to_reattach, 0, scroll_position)
+        self.last_search = (to_search, positions)
 
-        schedule_check(self.search_thread)
+    def get_children_changes(self, parent_node: str, nodes: List[str]) -> tuple[List[str], List[tuple]]:
+        # nodes to detach, and (node, parent, index) to reattach in this order, for parent_node to show nodes.
+        # Kept children do not move: they are in the same relative order before and after.
+        children = self.tree.get_children(parent_node)
+        if list(children) == nodes:
+            return [], []
+        kept = set(nodes)
+        attached = set(children)
+        return ([child for child in children if child not in kept],
+                [(node, parent_node, index) for index, node in enumerate(nodes) if node not in attached])
 
-    def on_search_background(self, to_reattach):
+    def reattach_batch(self, generation: int, to_reattach: List[tuple], start: int, scroll_position: float):
+        if generation != self.search_generation:
+            # a newer search will compute its changes from the current state of the tree
+            return
+        end = min(start + REATTACH_BATCH_SIZE, len(to_reattach))
+        for node, parent_node, index in to_reattach[start:end]:
+            self.tree.reattach(node, parent_node, index)
+        self.tree.yview_moveto(scroll_position)
+        if end < len(to_reattach):
+            self.after_idle(self.reattach_batch, generation, to_reattach, end, scroll_position)
+        else:
+            logging.info("Done updating tree view")
+
+    def on_search_return(self, event):
+        # selects the first substation, voltage level or equipment found
         if not self.tree_parent:
             return
-        to_search = self.search_var.get().lower()
+        hits = self.context.network_structure.search_index.hits(self.search_var.get(), limit=1)
+        if hits:
+            self.context.selection = hits[0].selection
+
+    def on_search_background(self, generation: int, search_index: 'ns.SearchIndex', to_search: str,
+                             within: Optional[np.ndarray]):
+        # stale searches are abandoned between steps, always putting a result so that the Tk thread stops polling
+        result = None
+        try:
+            positions = search_index.search(to_search, within)
+            if generation != self.search_generation:
+                return
+            included_substations, included_voltage_levels = self._get_included(search_index, to_search, positions)
+            if generation != self.search_generation:
+                return
+            result = (to_search, positions, included_substations, included_voltage_levels)
+        finally:
+            self.search_results.put((generation, result))
 
-        included_substations, included_voltage_levels = self._get_included(to_search)
-
-        index = -1
-        for substation in self.context.network_structure.substations:
-            if substation in included_substations:
-                index += 1
-                to_reattach.append((self.nodes_mapping[substation], self.tree_parent, index))
-
-        for voltage_level in self.context.network_structure.voltage_levels:
-            if voltage_level in included_voltage_levels:
-                voltage_level_node = self.nodes_mapping[voltage_level]
-                parent_node = self.tree_parent
-                if voltage_level.substation:
-                    parent_node = self.nodes_mapping[voltage_level.substation]
-                index += 1
-                to_reattach.append((voltage_level_node, parent_node, index))
-
-    def _get_included(self, to_search):
-        logging.info(f'Searching {to_search}...')
-        included_substations = set()
-        for substation in self.context.network_structure.substations:
-            if to_search in substation.substation_id.lower() or to_search in substation.name.lower():
-                included_substations.add(substation)
-        included_voltage_levels = set()
-        for voltage_level in self.context.network_structure.voltage_levels:
-            if to_search in voltage_level.voltage_level_id.lower() or to_search in voltage_level.name.lower():
-                included_voltage_levels.add(voltage_level)
-                if voltage_level.substation:
-                    included_substations.add(voltage_level.substation)
+    def _get_included(self, search_index: 'ns.SearchIndex', to_search: str, positions: np.ndarray):
+        network_structure = self.context.network_structure
+        included_substations = {network_structure.get_substation(substation_id)
+                                for substation_id in search_index.substation_ids(positions)}
+        # voltage levels matching by themselves or through one of their equipments
+        included_voltage_levels = {network_structure.get_voltage_level(voltage_level_id)
+                                   for voltage_level_id in search_index.voltage_level_ids(positions)}
+        for voltage_level in included_voltage_levels:
+            if voltage_level.substation:
+                included_substations.add(voltage_level.substation)
         logging.info(
             f'Searching {to_search}: {len(included_substations)} substations, '
             f'{len(included_voltage_levels)} voltage levels')
         return included_substations, included_voltage_levels
 
-    def _detach_all(self):
-        for level_1_item in self.tree.get_children(self.tree_parent):
-            for level_2_item in self.tree.get_children(level_1_item):
-                self.tree.detach(level_2_item)
-            self.tree.detach(level_1_item)
+    def is_included(self, substation_or_voltage_level: Union['ns.Substation', 'ns.VoltageLevel']) -> bool:
+        if self.included is None:
+            return True
+        included_substations, included_voltage_levels = self.included
+        return substation_or_voltage_level in included_substations or \
+            substation_or_voltage_level in included_voltage_levels
 
     def on_network_changed(self, network: pn.Network):
         self.tree.delete(*self.tree.get_children())
         self.tree_parent = None
+        self.nodes_mapping = {}
+        self.selection_mapping = {}
+        self.top_level_objects = []
+        self.inserted_count = 0
+        self.substation_voltage_levels = {}
+        self.populated_substations = set()
+        self.included = None
+        self.search_generation += 1
+        self.last_search = None
         if not network:
             return
         self.tree_parent = self.tree.insert('', 'end', text=network.name,
                                             values=['network', network.id], open=True)
 
-        for substation in self.context.network_structure.substations:
-            node = self.tree.insert(self.tree_parent, "end", text=f"{substation.name} ({substation.substation_id})",
-                                    values=['substation', substation.substation_id], open=True)
-            self.nodes_mapping[substation] = node
-            self.selection_mapping[substation.substation_id] = node
-
-        for voltage_level in self.context.network_structure.voltage_levels:
-            parent_node = self.tree_parent
+        network_structure = self.context.network_structure
+        self.top_level_objects = list(network_structure.substations)
+        for voltage_level in network_structure.voltage_levels:
             if voltage_level.substation:
-                parent_node = self.nodes_mapping[voltage_level.substation]
-            node = self.tree.insert(parent_node, "end", text=f"{voltage_level.name} ({voltage_level.voltage_level_id})",
-                                    values=['voltage_level', voltage_level.voltage_level_id])
-            self.nodes_mapping[voltage_level] = node
-            self.selection_mapping[voltage_level.voltage_level_id] = node
+                self.substation_voltage_levels.setdefault(voltage_level.substation.substation_id, []) \
+                    .append(voltage_level)
+            else:
+                self.top_level_objects.append(voltage_level)
+        # a first screen right away, the rest when idle
+        self.insert_chunk(self.top_level_objects)
+
+    def insert_chunk(self, top_level_objects: List[Union['ns.Substation', 'ns.VoltageLevel']]):
+        if top_level_objects is not self.top_level_objects:
+            # another network was opened meanwhile
+            return
+        end = min(self.inserted_count + INSERT_CHUNK_SIZE, len(top_level_objects))
+        for top_level_object in top_level_objects[self.inserted_count:end]:
+            self.insert_top_level(top_level_object)
+        self.inserted_count = end
+        if end < len(top_level_objects):
+            self.after_idle(self.insert_chunk, top_level_objects)
+
+    def insert_remaining(self):
+        for top_level_object in self.top_level_objects[self.inserted_count:]:
+            self.insert_top_level(top_level_object)
+        self.inserted_count = len(self.top_level_objects)
+
+    def insert_top_level(self, top_level_object: Union['ns.Substation', 'ns.VoltageLevel']):
+        if isinstance(top_level_object, ns.VoltageLevel):
+            self.insert_voltage_level(top_level_object, self.tree_parent)
+            return
+        substation = top_level_object
+        node = self.tree.insert(self.tree_parent, "end", text=f"{substation.name} ({substation.substation_id})",
+                                values=['substation', substation.substation_id])
+        self.nodes_mapping[substation] = node
+        self.selection_mapping[substation.substation_id] = node
+        if substation.substation_id in self.substation_voltage_levels:
+            # placeholder child showing the node can be opened
+            self.tree.insert(node, "end", text='', values=['placeholder', ''])
+            if len(self.top_level_objects) <= AUTO_OPEN_LIMIT:
+                self.populate(substation)
+                self.tree.item(node, open=True)
+
+    def insert_voltage_level(self, voltage_level: 'ns.VoltageLevel', parent_node: str):
+        node = self.tree.insert(parent_node, "end", text=f"{voltage_level.name} ({voltage_level.voltage_level_id})",
+                                values=['voltage_level', voltage_level.voltage_level_id])
+        self.nodes_mapping[voltage_level] = node
+        self.selection_mapping[voltage_level.voltage_level_id] = node
+
+    def populate(self, substation: 'ns.Substation'):
+        if substation.substation_id in self.populated_substations:
+            return
+        substation_node = self.nodes_mapping[substation]
+        self.tree.delete(*self.tree.get_children(substation_node))
+        hidden = []
+        for voltage_level in self.substation_voltage_levels.get(substation.substation_id, []):
+            self.insert_voltage_level(voltage_level, substation_node)
+            if not self.is_included(voltage_level):
+                hidden.append(self.nodes_mapping[voltage_level])
+        if hidden:
+            self.tree.detach(*hidden)
+        self.populated_substations.add(substation.substation_id)
+
+    def get_node(self, object_id: str) -> Optional[str]:
+        # inserts the node of a substation or voltage level not inserted yet
+        if object_id not in self.selection_mapping:
+            network_structure = self.context.network_structure
+            voltage_level = network_structure.get_voltage_level(object_id)
+            if voltage_level and voltage_level.substation:
+                self.insert_remaining()
+                self.populate(voltage_level.substation)
+            elif voltage_level or network_structure.get_substation(object_id):
+                self.insert_remaining()
+        return self.selection_mapping.get(object_id)
+
+    def on_tree_open(self, event):
+        values = self.tree.item(self.tree.focus())['values']
+        if values and values[0] == 'substation':
+            self.populate(self.context.network_structure.get_substation(str(values[1])))
+
+    def on_popup(self, event):
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return
+        values = self.tree.item(item)['values']
+        if values[0] not in ['substation', 'voltage_level']:
+            return
+        self.popup_item_values = values
+        self.popup_menu.tk_popup(event.x_root, event.y_root)
+
+    def select_neighbourhood(self, depth: int):
+        self.context.neighbourhood_depth = depth
+        self.context.selection = ('neighbourhood', self.popup_item_values[1], None)
+
+    def select_popup_item(self):
+        self.context.selection = (self.popup_item_values[0], self.popup_item_values[1], None)
 
     def on_tree_select(self, event):
         tree = event.widget
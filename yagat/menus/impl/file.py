@@ -5,12 +5,17 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 # SPDX-License-Identifier: MPL-2.0
 #
+import logging
+import threading
 import tkinter as tk
 from tkinter import filedialog as fd
+from typing import Optional
 
+import pyarrow as pa
 import pypowsybl as pp
 import pypowsybl.network as pn
 
+import yagat.networkstructure as ns
 from yagat.app_context import AppContext
 
 
@@ -77,13 +82,16 @@ class FileMenu(tk.Menu):
         self.add_separator()
         self.add_command(label='Save...', command=self.save_network)
         self.add_separator()
+        self.add_command(label='Open and refresh snapshot...', command=lambda: self.open_network(use_cache=False))
+        self.add_command(label='Clear snapshot cache', command=self.clear_snapshot_cache)
+        self.add_separator()
         self.add_command(
             label='Exit',
             command=context.tk_root.destroy,
             underline=1,
         )
 
-    def open_network(self):
+    def open_network(self, use_cache: bool = True):
         filename = fd.askopenfilename()
         if not filename:
             self.context.status_text = 'File opening cancelled by user'
@@ -92,16 +100,52 @@ class FileMenu(tk.Menu):
             # disable the network changed listener, the tree view update is messed up in GUI if updated in thread
             self.context.network_changed_listener_enabled = False
 
+            snapshot_cache = self.context.snapshot_cache
+            # (compact, key) of the snapshot to store once the network is shown, key None to compute it when storing
+            to_store = []
+
             def task():
-                self.context.network = pp.network.load(filename)
+                compact = self.context.compact_tables
+                key = None
+                network_structure = None
+                if use_cache:
+                    key = snapshot_cache.compute_key(filename, compact)
+                    network_structure = snapshot_cache.load(filename, compact, key)
+                else:
+                    snapshot_cache.invalidate(filename)
+                if network_structure is None:
+                    network_structure = ns.NetworkStructure(pp.network.load(filename), compact=compact)
+                    to_store.append((compact, key))
+                self.context.set_network(network_structure.network, network_structure)
 
             def on_done():
                 self.context.status_text = f'Network {self.context.network.name} loaded'
                 self.context.network_changed_listener_enabled = True
                 self.context.notify_network_changed()
+                if to_store:
+                    self.store_snapshot(filename, *to_store[0])
 
             self.context.start_long_running_task(name='Opening file', target=task, on_done=on_done)
 
+    def store_snapshot(self, filename: str, compact: bool, key: Optional[str]):
+        # Stored in a daemon thread after the network is shown, without taking the long running task slot.
+        # The file is loaded again in that thread: the snapshot shares nothing with the shown network, which the
+        # user can edit meanwhile.
+        snapshot_cache = self.context.snapshot_cache
+
+        def store():
+            try:
+                network_structure = ns.NetworkStructure(pp.network.load(filename), compact=compact)
+                snapshot_cache.store(filename, network_structure, key)
+            except (OSError, pp.PyPowsyblError, pa.ArrowException):
+                logging.exception(f'Could not store snapshot of {filename}')
+
+        threading.Thread(target=store, name='Storing snapshot', daemon=True).start()
+
+    def clear_snapshot_cache(self):
+        self.context.snapshot_cache.clear()
+        self.context.status_text = 'Snapshot cache cleared'
+
     def save_network(self):
         if not self.context.network:
             return
@@ -22,13 +22,16 @@ class RunMenu(tk.Menu):
         parent.add_cascade(label="Run", menu=self)
         self.add_command(label='AC Load Flow', command=lambda: self.run_load_flow(ac=True))
         self.add_command(label='DC Load Flow', command=lambda: self.run_load_flow(ac=False))
+        self.add_separator()
+        self.add_command(label='Take Reference Snapshot', command=self.take_reference_snapshot)
+        self.add_command(label='Clear Reference Snapshot', command=self.clear_reference_snapshot)
 
     def run_load_flow(self, ac: bool):
         reporter = pr.Reporter()
         self.context.status_text = 'Starting Load Flow'
 
         def on_done():
-            self.context.network_structure.refresh()
+            self.context.network_structure.refresh(results_only=True, incremental=True)
             self.context.notify_selection_changed()  # hack to trigger refresh
             self.context.status_text = 'Load Flow completed'
 
@@ -45,3 +48,22 @@ class RunMenu(tk.Menu):
             print(reporter)
 
         self.context.start_long_running_task(name='Load Flow', target=task, on_done=on_done)
+
+    def take_reference_snapshot(self):
+        self.context.status_text = 'Taking reference snapshot'
+        snapshot = {}
+
+        def on_done():
+            self.context.reference_snapshot = snapshot
+            self.context.notify_selection_changed()  # hack to trigger refresh
+            self.context.status_text = 'Reference snapshot taken, see View > Differences'
+
+        def task():
+            snapshot.update(self.context.network_structure.snapshot())
+
+        self.context.start_long_running_task(name='Take Reference Snapshot', target=task, on_done=on_done)
+
+    def clear_reference_snapshot(self):
+        self.context.reference_snapshot = None
+        self.context.notify_selection_changed()
+        self.context.status_text = 'Reference snapshot cleared'
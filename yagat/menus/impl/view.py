@@ -43,6 +43,15 @@ class ViewMenu(tk.Menu):
         self.add_separator()
         self.add_command(label='Components (Islands)',
                          command=lambda: self.update_view_and_tab_group('TreeAndTabs', 'Components (Islands)'))
+        self.add_command(label='Differences',
+                         command=lambda: self.update_view_and_tab_group('TreeAndTabs', 'Differences'))
+        self.add_separator()
+        self.compact_tables_var = tk.BooleanVar(value=context.compact_tables)
+        self.add_checkbutton(label='Compact Tables (next opened network)', variable=self.compact_tables_var,
+                             command=self.toggle_compact_tables)
+        self.virtual_list_views_var = tk.BooleanVar(value=context.virtual_list_views)
+        self.add_checkbutton(label='Virtualized Large Lists', variable=self.virtual_list_views_var,
+                             command=self.toggle_virtual_list_views)
         self.add_separator()
         self.add_command(label='Load Flow Parameters', command=self.view_load_flow_parameters)
         self.add_separator()
@@ -52,6 +61,12 @@ class ViewMenu(tk.Menu):
         self.context.selected_view = view
         self.context.selected_tab_group = tab_group
 
+    def toggle_compact_tables(self):
+        self.context.compact_tables = self.compact_tables_var.get()
+
+    def toggle_virtual_list_views(self):
+        self.context.virtual_list_views = self.virtual_list_views_var.get()
+
     def view_load_flow_parameters(self):
         self.context.selected_view = 'LoadFlowParameters'
 
@@ -5,9 +5,14 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 # SPDX-License-Identifier: MPL-2.0
 #
+from .impl.bus_graph import BusGraph
 from .impl.bus_views import BusView
 from .impl.connection import Connection
+from .impl.connection_table import ConnectionTable, NO_SIDE
 from .impl.equipment_type import EquipmentType, ShuntCompensatorType
+from .impl.network_diff import ChangeType, DEFAULT_TOLERANCE, diff_snapshots, diff_tables, empty_diff
 from .impl.network_structure import NetworkStructure
+from .impl.search_index import SearchHit, SearchIndex
+from .impl.snapshot_cache import SnapshotCache
 from .impl.substation import Substation
 from .impl.voltage_level import VoltageLevel
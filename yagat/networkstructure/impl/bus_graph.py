@@ -0,0 +1,89 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+# Bus adjacency in compressed sparse row form: the neighbours of the bus at position b are
+# indices[indptr[b]:indptr[b + 1]], reached through the equipments edge_equipment_ids[indptr[b]:indptr[b + 1]].
+# Each edge is stored in both directions, parallel branches are kept as distinct edges.
+class BusGraph:
+
+    def __init__(self, bus_ids: pd.Index, buses1: np.ndarray, buses2: np.ndarray, equipment_ids: np.ndarray):
+        # buses1, buses2: bus ids of the edges ends, edges with an unknown or disconnected end are dropped
+        self._bus_ids = bus_ids
+        positions1 = bus_ids.get_indexer(buses1)
+        positions2 = bus_ids.get_indexer(buses2)
+        valid = (positions1 >= 0) & (positions2 >= 0) & (positions1 != positions2)
+        sources = np.concatenate([positions1[valid], positions2[valid]])
+        targets = np.concatenate([positions2[valid], positions1[valid]])
+        edge_equipment_ids = np.concatenate([equipment_ids[valid], equipment_ids[valid]])
+        order = np.argsort(sources, kind='stable')
+        self.indices: np.ndarray = targets[order].astype(np.int32)
+        self.edge_equipment_ids: np.ndarray = edge_equipment_ids[order]
+        self.indptr: np.ndarray = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=len(bus_ids)))))
+
+    @property
+    def bus_ids(self) -> pd.Index:
+        return self._bus_ids
+
+    def __len__(self) -> int:
+        return len(self._bus_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def position(self, bus_id: str) -> int:
+        # -1 for an unknown bus
+        try:
+            return int(self._bus_ids.get_loc(bus_id))
+        except KeyError:
+            return -1
+
+    def neighbour_positions(self, position: int) -> np.ndarray:
+        return np.unique(self.indices[self.indptr[position]:self.indptr[position + 1]])
+
+    def neighbours(self, bus_id: str) -> List[str]:
+        position = self.position(bus_id)
+        if position < 0:
+            return []
+        return self._bus_ids[self.neighbour_positions(position)].tolist()
+
+    def edges(self, bus_id: str) -> List[tuple[str, str]]:
+        # (equipment id, neighbour bus id) of each edge of the bus
+        position = self.position(bus_id)
+        if position < 0:
+            return []
+        start, end = self.indptr[position], self.indptr[position + 1]
+        return list(zip(self.edge_equipment_ids[start:end].tolist(),
+                        self._bus_ids[self.indices[start:end]].tolist()))
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def bfs(self, sources: np.ndarray, depth: int) -> np.ndarray:
+        # positions of the buses at most depth edges away from the sources, in breadth first order.
+        # Each level is expanded at once: the adjacency slices of the whole frontier are gathered in one index array.
+        visited = np.zeros(len(self), dtype=bool)
+        frontier = np.unique(sources)
+        visited[frontier] = True
+        reached = [frontier]
+        for _ in range(depth):
+            if len(frontier) == 0:
+                break
+            starts = self.indptr[frontier]
+            lengths = self.indptr[frontier + 1] - starts
+            edges = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            neighbours = np.unique(self.indices[edges])
+            frontier = neighbours[~visited[neighbours]]
+            visited[frontier] = True
+            reached.append(frontier)
+        return np.concatenate(reached)
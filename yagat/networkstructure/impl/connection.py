@@ -14,45 +14,47 @@ import yagat.networkstructure as ns
 
 
 class Connection:
-    def __init__(self, network_structure: 'ns.NetworkStructure', voltage_level: 'ns.VoltageLevel', equipment_id: str,
-                 equipment_type: 'ns.EquipmentType',
-                 side: Optional[int] = None, name: Optional[str] = None):
-        self._network_structure = network_structure
-        self._voltage_level = voltage_level
-        self._equipment_id = equipment_id
-        self._name = name
-        self._equipment_type = equipment_type
-        self._side = side
+    # lightweight view over a row of the network structure ns.ConnectionTable
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: 'ns.ConnectionTable', row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def row(self) -> int:
+        return self._row
 
     @property
     def equipment_id(self) -> str:
-        return self._equipment_id
+        return self._table.equipment_ids[self._row]
 
     @property
     def name(self) -> str:
-        if self._name:
-            return self._name
-        return self._equipment_id
+        name = self._table.names[self._row]
+        if name:
+            return name
+        return self.equipment_id
 
     @property
     def equipment_type(self) -> 'ns.EquipmentType':
-        return self._equipment_type
+        return self._table.equipment_type(self._row)
 
     @property
     def side(self) -> Optional[int]:
-        return self._side
+        return self._table.side(self._row)
 
     @property
     def voltage_level(self) -> 'ns.VoltageLevel':
-        return self._voltage_level
+        return self._table.voltage_level(self._row)
 
     @property
     def substation(self) -> 'Optional[ns.Substation]':
-        return self._voltage_level.substation
+        return self.voltage_level.substation
 
     @property
     def network_structure(self) -> 'ns.NetworkStructure':
-        return self._network_structure
+        return self._table.network_structure
 
     def _side_char(self):
         if not self.side:
@@ -64,12 +66,7 @@ class Connection:
             if bus_view == ns.BusView.BUS_BRANCH:
                 return ''
             elif bus_view == ns.BusView.BUS_BREAKER:
-                if self.network_structure.is_retained(self):
-                    # omg
-                    return str(self.network_structure.get_bus_breaker_topology(self.voltage_level).switches.loc[
-                                   self.equipment_id][f'bus{self._side_char()}_id'])
-                else:
-                    return ''
+                return self.network_structure.get_retained_switch_bus_id(self)
         prefix = ''
         if bus_view == ns.BusView.BUS_BREAKER:
             prefix = 'bus_breaker_'
@@ -98,5 +95,11 @@ class Connection:
     def get_data(self) -> pd.DataFrame:
         return self.network_structure.get_connection_data(self.equipment_id, self.side)
 
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Connection) and self._table is other._table and self._row == other._row
+
+    def __hash__(self) -> int:
+        return hash(self._row)
+
     def __repr__(self) -> str:
-        return f'Connection {self._equipment_type} {self._equipment_id} on side {self._side_char()}'
+        return f'Connection {self.equipment_type} {self.equipment_id} on side {self._side_char()}'
@@ -0,0 +1,145 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+import yagat.networkstructure as ns
+
+# side stored as int8, 0 stands for injections (no side)
+NO_SIDE = 0
+
+
+# Struct-of-arrays store of all connections (branch sides, injections, switch sides) of a network.
+# A connection is identified by its integer row, ns.Connection objects are views created on demand.
+# Rows of a same equipment are contiguous and ordered by side.
+class ConnectionTable:
+
+    def __init__(self, network_structure: 'ns.NetworkStructure', voltage_levels: List['ns.VoltageLevel']):
+        self._network_structure = network_structure
+        self._voltage_levels = voltage_levels
+        self._voltage_level_index = pd.Index([vl.voltage_level_id for vl in voltage_levels])
+        self._equipment_types: List[ns.EquipmentType] = list(ns.EquipmentType)
+        self._blocks: list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+
+        self.equipment_ids: np.ndarray = np.empty(0, dtype=object)
+        self.names: np.ndarray = np.empty(0, dtype=object)
+        self.type_codes: np.ndarray = np.empty(0, dtype=np.int8)
+        self.sides: np.ndarray = np.empty(0, dtype=np.int8)
+        self.voltage_level_indices: np.ndarray = np.empty(0, dtype=np.int32)
+
+        self._equipment_index: pd.Index = pd.Index([])
+        self._equipment_first_rows: np.ndarray = np.empty(0, dtype=np.int64)
+        self._voltage_level_indptr: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._voltage_level_rows: np.ndarray = np.empty(0, dtype=np.int64)
+
+    @property
+    def network_structure(self) -> 'ns.NetworkStructure':
+        return self._network_structure
+
+    def add_equipments(self, equipment_type: 'ns.EquipmentType', equipments_df: pd.DataFrame,
+                       sides: List[Optional[int]], voltage_level_columns: List[str]) -> None:
+        if equipments_df.empty:
+            return
+        side_count = len(sides)
+        equipment_ids = equipments_df.index.astype(str).to_numpy(dtype=object)
+        names = equipments_df['name'].to_numpy(dtype=object)
+        # sides interleaved per equipment
+        voltage_level_ids = equipments_df[voltage_level_columns].to_numpy().ravel()
+        voltage_level_indices = self._voltage_level_index.get_indexer(voltage_level_ids).astype(np.int32)
+        if (voltage_level_indices < 0).any():
+            missing = voltage_level_ids[voltage_level_indices < 0][0]
+            raise RuntimeError(f'Unknown voltage level {missing} for {equipment_type}')
+        self._blocks.append((np.repeat(equipment_ids, side_count),
+                             np.repeat(names, side_count),
+                             np.full(len(voltage_level_ids), self.type_code(equipment_type), dtype=np.int8),
+                             np.tile(np.array([side or NO_SIDE for side in sides], dtype=np.int8),
+                                     len(equipment_ids)),
+                             voltage_level_indices))
+
+    def build(self) -> None:
+        if self._blocks:
+            self.equipment_ids, self.names, self.type_codes, self.sides, self.voltage_level_indices = (
+                np.concatenate(arrays) for arrays in zip(*self._blocks))
+        self._blocks = []
+
+        first_rows = np.flatnonzero(self.sides <= 1)
+        self._equipment_index = pd.Index(self.equipment_ids[first_rows])
+        self._equipment_first_rows = first_rows
+
+        # stable sort keeps insertion order within each voltage level
+        self._voltage_level_rows = np.argsort(self.voltage_level_indices, kind='stable')
+        counts = np.bincount(self.voltage_level_indices, minlength=len(self._voltage_levels))
+        self._voltage_level_indptr = np.concatenate(([0], np.cumsum(counts)))
+
+    def to_data_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({'equipment_id': self.equipment_ids, 'name': self.names, 'type_code': self.type_codes,
+                             'side': self.sides, 'voltage_level_index': self.voltage_level_indices})
+
+    @staticmethod
+    def from_data_frame(network_structure: 'ns.NetworkStructure', voltage_levels: List['ns.VoltageLevel'],
+                        df: pd.DataFrame) -> 'ConnectionTable':
+        connection_table = ConnectionTable(network_structure, voltage_levels)
+        connection_table._blocks = [(df['equipment_id'].to_numpy(dtype=object), df['name'].to_numpy(dtype=object),
+                                     df['type_code'].to_numpy(dtype=np.int8), df['side'].to_numpy(dtype=np.int8),
+                                     df['voltage_level_index'].to_numpy(dtype=np.int32))]
+        connection_table.build()
+        return connection_table
+
+    def __len__(self) -> int:
+        return len(self.equipment_ids)
+
+    def type_code(self, equipment_type: 'ns.EquipmentType') -> int:
+        return self._equipment_types.index(equipment_type)
+
+    def type_rows(self, equipment_type: 'ns.EquipmentType') -> np.ndarray:
+        return np.flatnonzero(self.type_codes == self.type_code(equipment_type))
+
+    def equipment_type(self, row: int) -> 'ns.EquipmentType':
+        return self._equipment_types[self.type_codes[row]]
+
+    def side(self, row: int) -> Optional[int]:
+        side = int(self.sides[row])
+        return None if side == NO_SIDE else side
+
+    def voltage_level(self, row: int) -> 'ns.VoltageLevel':
+        return self._voltage_levels[self.voltage_level_indices[row]]
+
+    def voltage_level_ids(self, rows: np.ndarray) -> List[str]:
+        return self._voltage_level_index[self.voltage_level_indices[rows]].tolist()
+
+    def find(self, equipment_id: str, side: Optional[int] = None) -> Optional[int]:
+        try:
+            position = self._equipment_index.get_loc(equipment_id)
+        except KeyError:
+            return None
+        row = self._equipment_first_rows[position] + (side - 1 if side else 0)
+        if row >= len(self.sides) or self.equipment_ids[row] != equipment_id or self.side(row) != side:
+            return None
+        return int(row)
+
+    def find_rows(self, equipment_ids: np.ndarray) -> np.ndarray:
+        # first row of each equipment, -1 for unknown ones
+        positions = self._equipment_index.get_indexer(equipment_ids)
+        rows = np.full(len(positions), -1, dtype=np.int64)
+        found = positions >= 0
+        rows[found] = self._equipment_first_rows[positions[found]]
+        return rows
+
+    def voltage_level_rows(self, voltage_level_index: int) -> np.ndarray:
+        return self._voltage_level_rows[
+               self._voltage_level_indptr[voltage_level_index]:self._voltage_level_indptr[voltage_level_index + 1]]
+
+    def get_connection(self, row: Optional[int]) -> 'Optional[ns.Connection]':
+        if row is None:
+            return None
+        return ns.Connection(self, row)
+
+    def get_connections(self, rows) -> List['ns.Connection']:
+        return [ns.Connection(self, int(row)) for row in rows]
@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+from enum import StrEnum
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOLERANCE = 1e-6
+DIFF_COLUMNS = ['table', 'change', 'column', 'before', 'after', 'delta']
+
+
+class ChangeType(StrEnum):
+    ADDED = 'ADDED'
+    REMOVED = 'REMOVED'
+    CHANGED = 'CHANGED'
+
+
+def diff_snapshots(before: Dict[str, pd.DataFrame], after: Dict[str, pd.DataFrame],
+                   tolerances: Optional[Dict[str, float]] = None,
+                   default_tolerance: float = DEFAULT_TOLERANCE) -> pd.DataFrame:
+    # differences between the tables of two snapshots, one row per added or removed equipment
+    # and per changed value, indexed by equipment id
+    diffs = [diff_tables(name, before[name], after[name], tolerances, default_tolerance)
+             for name in before if name in after]
+    diffs = [diff for diff in diffs if not diff.empty]
+    if not diffs:
+        return empty_diff()
+    return pd.concat(diffs)
+
+
+def empty_diff() -> pd.DataFrame:
+    df = pd.DataFrame({column: pd.Series(dtype=np.float64 if column == 'delta' else object)
+                       for column in DIFF_COLUMNS})
+    df.index.name = 'id'
+    return df
+
+
+def diff_tables(name: str, before: pd.DataFrame, after: pd.DataFrame,
+                tolerances: Optional[Dict[str, float]] = None,
+                default_tolerance: float = DEFAULT_TOLERANCE) -> pd.DataFrame:
+    tolerances = tolerances or {}
+    # rows aligned by index, positions in the other table, -1 when missing.
+    # Tables with duplicated ids, such as the boundaries of an area, are aligned by id and occurrence of the id.
+    with_occurrence = not (before.index.is_unique and after.index.is_unique)
+    before_keys = _row_keys(before.index, with_occurrence)
+    after_keys = _row_keys(after.index, with_occurrence)
+    after_positions = after_keys.get_indexer(before_keys)
+    removed = np.flatnonzero(after_positions < 0)
+    added = np.flatnonzero(before_keys.get_indexer(after_keys) < 0)
+    common = np.flatnonzero(after_positions >= 0)
+    common_after = after_positions[common]
+
+    ids: List[np.ndarray] = [_ids(before.index[removed]), _ids(after.index[added])]
+    changes: List[np.ndarray] = [np.full(len(removed), str(ChangeType.REMOVED), dtype=object),
+                                 np.full(len(added), str(ChangeType.ADDED), dtype=object)]
+    columns: List[np.ndarray] = [np.full(len(removed) + len(added), '', dtype=object)]
+    before_values: List[np.ndarray] = [np.full(len(removed) + len(added), None, dtype=object)]
+    after_values: List[np.ndarray] = [np.full(len(removed) + len(added), None, dtype=object)]
+    deltas: List[np.ndarray] = [np.full(len(removed) + len(added), np.nan)]
+
+    for column in before.columns.intersection(after.columns, sort=False):
+        before_column = before[column].to_numpy()[common]
+        after_column = after[column].to_numpy()[common_after]
+        changed, delta = _compare(before[column].dtype, after[column].dtype, before_column, after_column,
+                                  tolerances.get(column, default_tolerance))
+        rows = np.flatnonzero(changed)
+        if len(rows) == 0:
+            continue
+        ids.append(_ids(before.index[common[rows]]))
+        changes.append(np.full(len(rows), str(ChangeType.CHANGED), dtype=object))
+        columns.append(np.full(len(rows), column, dtype=object))
+        before_values.append(before_column[rows].astype(object))
+        after_values.append(after_column[rows].astype(object))
+        deltas.append(delta[rows])
+
+    return pd.DataFrame({'table': name, 'change': np.concatenate(changes), 'column': np.concatenate(columns),
+                         'before': np.concatenate(before_values), 'after': np.concatenate(after_values),
+                         'delta': np.concatenate(deltas)},
+                        index=pd.Index(np.concatenate(ids), name='id', dtype=object))
+
+
+def _compare(before_dtype, after_dtype, before_values: np.ndarray, after_values: np.ndarray,
+             tolerance: float) -> tuple[np.ndarray, np.ndarray]:
+    # changed mask and after - before delta, NaN for non numeric values. Missing values on both sides are equal.
+    if _is_number(before_dtype) and _is_number(after_dtype):
+        before_values = before_values.astype(np.float64)
+        after_values = after_values.astype(np.float64)
+        delta = after_values - before_values
+        both_missing = np.isnan(before_values) & np.isnan(after_values)
+        # a NaN delta (value on one side only) is never within tolerance
+        return ~both_missing & ~(np.abs(delta) <= tolerance), delta
+    before_values = before_values.astype(object)
+    after_values = after_values.astype(object)
+    equal = (before_values == after_values) | (pd.isna(before_values) & pd.isna(after_values))
+    return ~equal, np.full(len(before_values), np.nan)
+
+
+def _row_keys(index: pd.Index, with_occurrence: bool) -> pd.Index:
+    # the index, with the rank of each row among the rows with the same id as an extra level if with_occurrence
+    if not with_occurrence:
+        return index
+    levels = list(range(index.nlevels))
+    occurrences = pd.Series(0, index=index).groupby(level=levels, dropna=False).cumcount().to_numpy()
+    return pd.MultiIndex.from_arrays([index.get_level_values(level) for level in levels] + [occurrences])
+
+
+def _is_number(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _ids(index: pd.Index) -> np.ndarray:
+    # multi indexes, such as non linear shunt sections, flattened to a single string id
+    if isinstance(index, pd.MultiIndex):
+        return np.array([' '.join(str(level) for level in value) for value in index], dtype=object)
+    return index.to_numpy(dtype=object)
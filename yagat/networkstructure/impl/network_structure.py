@@ -6,7 +6,9 @@
 # SPDX-License-Identifier: MPL-2.0
 #
 import logging
-from typing import Dict, List, Optional, Tuple, Union
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import numpy as np
 import pandas as pd
@@ -15,102 +17,209 @@ import pypowsybl.network as pn
 
 import yagat.networkstructure as ns
 
+BRANCH_ATTRIBUTES = ['name', 'connected1', 'connected2', 'p1', 'q1', 'i1', 'p2', 'q2', 'i2', 'bus1_id',
+                     'bus_breaker_bus1_id', 'voltage_level1_id', 'bus2_id', 'bus_breaker_bus2_id', 'voltage_level2_id']
+
+BRANCH_RESULTS = ['p1', 'q1', 'i1', 'p2', 'q2', 'i2']
+INJECTION_RESULTS = ['p', 'q', 'i']
+
+# low cardinality columns, repeated across many rows, stored as categoricals in compact mode.
+# Columns holding the same kind of values share one dictionary (categorical dtype) across all tables.
+# Per row identifiers like bus ids are left as is: as many categories as rows would not save memory.
+COMPACT_COLUMNS = {
+    'voltage_level_id': 'voltage_level', 'voltage_level1_id': 'voltage_level', 'voltage_level2_id': 'voltage_level',
+    'voltage_level3_id': 'voltage_level', 'substation_id': 'substation',
+    'substation_name': 'substation_name', 'voltage_level_name': 'voltage_level_name',
+    'country': 'country', 'energy_source': 'energy_source', 'kind': 'kind', 'type': 'type',
+    'model_type': 'model_type', 'topology_kind': 'topology_kind', 'area_id': 'area', 'area_type': 'area_type',
+    'shunt_type': 'shunt_type',
+}
+
+# edited columns that change the topology or the structure, an incremental refresh falls back to a full one
+TOPOLOGY_COLUMNS = {'connected', 'connected1', 'connected2', 'connected3', 'open', 'retained', 'bus_id', 'bus1_id',
+                    'bus2_id', 'bus3_id', 'voltage_level_id', 'voltage_level1_id', 'voltage_level2_id',
+                    'voltage_level3_id', 'substation_id'}
+# tables behind the substations, voltage levels and derived tables, only reloaded by a full refresh
+STRUCTURE_TABLES = {'substations', 'voltage_levels', 'components'}
+
+# name of the connection table in snapshot tables, see get_snapshot_tables
+CONNECTION_TABLE = 'connection_table'
+BUS_RESULTS = ['v_mag', 'v_angle', 'connected_component', 'synchronous_component']
+
+# per connection values, as read by Connection.get_p/get_q/get_i/get_connected/get_bus_id
+CONNECTION_VALUES_DTYPE = np.dtype([('p', np.float64), ('q', np.float64), ('i', np.float64), ('connected', np.bool_),
+                                    ('bus_id', object), ('bus_breaker_bus_id', object)])
+
 
 class NetworkStructure:
-    def __init__(self, network: pn.Network):
+    # tables: previously saved snapshot tables, to restore instead of querying the network
+    # compact: categorical identifier columns and downcast integer columns, to reduce memory
+    def __init__(self, network: pn.Network, tables: Optional[Dict[str, pd.DataFrame]] = None,
+                 compact: bool = False):
         self._network: pn.Network = network
         self._substations: Dict[str, ns.Substation] = {}
         self._voltage_levels: Dict[str, ns.VoltageLevel] = {}
-        self._connections: Dict[Tuple[str, Optional[int]], ns.Connection] = {}
-
-        self._areas_df: pd.DataFrame = pd.DataFrame()
-        self._areas_boundaries_df: pd.DataFrame = pd.DataFrame()
-        self._substations_df: pd.DataFrame = pd.DataFrame()
-        self._voltage_levels_df: pd.DataFrame = pd.DataFrame()
-
-        self._injections_df: Dict[ns.EquipmentType, pd.DataFrame] = {}
-        self._branches_df: Dict[ns.EquipmentType, pd.DataFrame] = {}
-        self._three_windings_transformers_df: pd.DataFrame = pd.DataFrame()
-        self._tie_lines_df: pd.DataFrame = pd.DataFrame()
-        self._buses_df: pd.DataFrame = pd.DataFrame()
-        self._buses_bus_breaker_view_df: pd.DataFrame = pd.DataFrame()
-        self._switches_df: pd.DataFrame = pd.DataFrame()
-        self._hvdc_lines_df: pd.DataFrame = pd.DataFrame()
-
-        self._linear_shunt_compensator_sections_df: pd.DataFrame = pd.DataFrame()
-        self._non_linear_shunt_compensator_sections_df: pd.DataFrame = pd.DataFrame()
-
-        self._components_df: pd.DataFrame = pd.DataFrame()
+        self._connection_table: Optional[ns.ConnectionTable] = None
         self._lf_components_results: list[lf.ComponentResult] = []
 
-        self._bus_breaker_topology_cache: Dict[str, pn.BusBreakerTopology] = {}
-
-        self.refresh()
-
-        for substation_idx, substation_s in self._substations_df.iterrows():
-            substation_id = str(substation_idx)
-            self._substations[substation_id] = ns.Substation(self, substation_id, str(substation_s['name']))
-
-        for voltage_level_idx, voltage_level_s in self._voltage_levels_df.iterrows():
-            voltage_level_id = str(voltage_level_idx)
-            substation_id = voltage_level_s.substation_id
-            substation = None
-            if substation_id in self._substations:
-                substation = self._substations[substation_id]
-            voltage_level = ns.VoltageLevel(self, substation, voltage_level_id, str(voltage_level_s['name']))
+        # tables are fetched on first access and cached until the next full refresh, which bumps the generation
+        self._generation: int = 0
+        self._tables: Dict[str, pd.DataFrame] = {}
+        self._tables_generation: Dict[str, int] = {}
+        self._compact = compact
+        # compact mode dictionaries, per kind of values, only appended to so that codes agree across tables
+        self._dictionaries: Dict[str, pd.CategoricalDtype] = {}
+        # rows edited since the last refresh: table name -> row id -> edited columns, see update_value
+        self._dirty_rows: Dict[str, Dict[str, set[str]]] = {}
+        self._dirty_version: int = 0
+        # incremented on every refresh and edit, when the content of the cached tables may change
+        self._data_version: int = 0
+        self._rows_changed_listeners: List[Callable[[str, List[str]], None]] = []
+        # derived indexes, rebuilt on first access after a topology change
+        self._topology_version: int = 0
+        self._indexes: Dict[Any, tuple[int, Any]] = {}
+        # built once per network load like the connection table it reads, dropped when equipments are renamed
+        self._search_index: Optional[ns.SearchIndex] = None
+        self._table_loaders: Dict[str, Callable[..., pd.DataFrame]] = {
+            'areas': lambda **kwargs: self._network.get_areas(all_attributes=True, **kwargs),
+            'areas_boundaries': lambda **kwargs: self._network.get_areas_boundaries(all_attributes=True,
+                                                                                    **kwargs),
+            'substations': lambda **kwargs: self._network.get_substations(all_attributes=True, **kwargs),
+            'voltage_levels': lambda **kwargs: self.__load_merged('voltage_levels', **kwargs),
+            'buses': lambda **kwargs: self.__load_merged('buses', **kwargs),
+            'buses_bus_breaker_view': lambda **kwargs: self.__load_merged('buses_bus_breaker_view', **kwargs),
+            'components': self.__build_components,
+            'lines': lambda **kwargs: self._network.get_lines(attributes=BRANCH_ATTRIBUTES, **kwargs),
+            'two_windings_transformers': lambda **kwargs: self._network.get_2_windings_transformers(
+                attributes=BRANCH_ATTRIBUTES, **kwargs),
+            'three_windings_transformers': lambda **kwargs: self._network.get_3_windings_transformers(
+                attributes=['name', 'connected1', 'connected2', 'connected3', 'p1', 'q1', 'i1', 'p2', 'q2', 'i2',
+                            'p3', 'q3', 'i3', 'bus1_id', 'bus_breaker_bus1_id', 'voltage_level1_id', 'bus2_id',
+                            'bus_breaker_bus2_id', 'voltage_level2_id', 'bus3_id', 'bus_breaker_bus3_id',
+                            'voltage_level3_id'], **kwargs),
+            'tie_lines': lambda **kwargs: self._network.get_tie_lines(all_attributes=True, **kwargs),
+            'switches': lambda **kwargs: self.__load_merged('switches', **kwargs),
+            'loads': lambda **kwargs: self._network.get_loads(
+                attributes=['name', 'connected', 'type', 'p0', 'q0', 'p', 'q', 'i',
+                            'bus_id', 'bus_breaker_bus_id', 'voltage_level_id', 'fictitious'], **kwargs),
+            'generators': lambda **kwargs: self._network.get_generators(
+                attributes=['name', 'connected', 'energy_source', 'target_p', 'min_p', 'max_p',
+                            'voltage_regulator_on', 'target_q', 'target_v', 'p', 'q', 'i',
+                            'bus_id', 'bus_breaker_bus_id', 'voltage_level_id', 'fictitious'], **kwargs),
+            'dangling_lines': lambda **kwargs: self._network.get_dangling_lines(
+                attributes=['name', 'connected', 'p0', 'q0', 'p', 'q', 'i', 'boundary_p', 'boundary_q',
+                            'boundary_v_mag', 'boundary_v_angle', 'bus_id', 'bus_breaker_bus_id', 'voltage_level_id',
+                            'pairing_key', 'paired', 'tie_line_id', 'fictitious'], **kwargs),
+            'shunt_compensators': lambda **kwargs: self.__load_merged('shunt_compensators', **kwargs),
+            'static_var_compensators': lambda **kwargs: self._network.get_static_var_compensators(
+                all_attributes=True, **kwargs),
+            'lcc_converter_stations': lambda **kwargs: self._network.get_lcc_converter_stations(
+                all_attributes=True, **kwargs),
+            'vsc_converter_stations': lambda **kwargs: self._network.get_vsc_converter_stations(
+                all_attributes=True, **kwargs),
+            'linear_shunt_compensator_sections': lambda **kwargs: (
+                self._network.get_linear_shunt_compensator_sections(all_attributes=True, **kwargs)),
+            'non_linear_shunt_compensator_sections': lambda **kwargs: (
+                self._network.get_non_linear_shunt_compensator_sections(all_attributes=True, **kwargs)),
+            'hvdc_lines': lambda **kwargs: self._network.get_hvdc_lines(all_attributes=True, **kwargs),
+        }
+        # tables merged with the tables they depend on, as (network getter, merge), in dependency order
+        self._merged_tables: Dict[str, tuple[Callable[..., pd.DataFrame], Callable[[pd.DataFrame], pd.DataFrame]]] = {
+            'voltage_levels': (self.__get_voltage_levels, self.__merge_substations),
+            'buses': (self._network.get_buses, self.__merge_voltage_levels),
+            'buses_bus_breaker_view': (self._network.get_bus_breaker_view_buses, self.__merge_voltage_levels),
+            'switches': (self.__get_switches, self.__add_retained_switch_buses),
+            'shunt_compensators': (self.__get_shunt_compensators, self.__add_shunt_compensator_types),
+        }
+        # columns changed by a load flow, see refresh(results_only=True)
+        self._table_results: Dict[str, tuple[Callable[..., pd.DataFrame], List[str]]] = {
+            'areas': (self._network.get_areas, ['interchange', 'ac_interchange', 'dc_interchange']),
+            'areas_boundaries': (self._network.get_areas_boundaries, ['p', 'q']),
+            'buses': (self._network.get_buses, BUS_RESULTS),
+            'buses_bus_breaker_view': (self._network.get_bus_breaker_view_buses, BUS_RESULTS),
+            'lines': (self._network.get_lines, BRANCH_RESULTS),
+            'two_windings_transformers': (self._network.get_2_windings_transformers, BRANCH_RESULTS),
+            'three_windings_transformers': (self._network.get_3_windings_transformers,
+                                            BRANCH_RESULTS + ['p3', 'q3', 'i3']),
+            'loads': (self._network.get_loads, INJECTION_RESULTS),
+            'generators': (self._network.get_generators, INJECTION_RESULTS),
+            'dangling_lines': (self._network.get_dangling_lines,
+                               INJECTION_RESULTS + ['boundary_p', 'boundary_q', 'boundary_v_mag', 'boundary_v_angle']),
+            'shunt_compensators': (self._network.get_shunt_compensators, INJECTION_RESULTS + ['section_count']),
+            'static_var_compensators': (self._network.get_static_var_compensators, INJECTION_RESULTS),
+            'lcc_converter_stations': (self._network.get_lcc_converter_stations, INJECTION_RESULTS),
+            'vsc_converter_stations': (self._network.get_vsc_converter_stations, INJECTION_RESULTS),
+        }
+        self._equipment_tables: Dict[ns.EquipmentType, tuple[str, Callable[..., pd.DataFrame]]] = {
+            ns.EquipmentType.LOAD: ('loads', self._network.get_loads),
+            ns.EquipmentType.GENERATOR: ('generators', self._network.get_generators),
+            ns.EquipmentType.LINE: ('lines', self._network.get_lines),
+            ns.EquipmentType.TWO_WINDINGS_TRANSFORMER: ('two_windings_transformers',
+                                                        self._network.get_2_windings_transformers),
+            ns.EquipmentType.THREE_WINDINGS_TRANSFORMER: ('three_windings_transformers',
+                                                          self._network.get_3_windings_transformers),
+            ns.EquipmentType.DANGLING_LINE: ('dangling_lines', self._network.get_dangling_lines),
+            ns.EquipmentType.STATIC_VAR_COMPENSATOR: ('static_var_compensators',
+                                                      self._network.get_static_var_compensators),
+            ns.EquipmentType.SHUNT_COMPENSATOR: ('shunt_compensators', self._network.get_shunt_compensators),
+            ns.EquipmentType.LCC_CONVERTER_STATION: ('lcc_converter_stations',
+                                                     self._network.get_lcc_converter_stations),
+            ns.EquipmentType.VSC_CONVERTER_STATION: ('vsc_converter_stations',
+                                                     self._network.get_vsc_converter_stations),
+            ns.EquipmentType.SWITCH: ('switches', self._network.get_switches),
+        }
+
+        tables = tables or {}
+        for name, df in tables.items():
+            if name in self._table_loaders:
+                self.__set_table(name, df)
+
+        substations_df = self.substations_df
+        for substation_id, name in zip(substations_df.index, substations_df['name']):
+            substation_id = str(substation_id)
+            self._substations[substation_id] = ns.Substation(self, substation_id, str(name))
+
+        voltage_levels_df = self.voltage_levels_df
+        for index, (voltage_level_id, name, substation_id) in enumerate(zip(voltage_levels_df.index,
+                                                                            voltage_levels_df['name'],
+                                                                            voltage_levels_df['substation_id'])):
+            voltage_level_id = str(voltage_level_id)
+            substation = self._substations.get(substation_id)
+            voltage_level = ns.VoltageLevel(self, substation, voltage_level_id, str(name), index)
             self._voltage_levels[voltage_level_id] = voltage_level
             if substation:
                 substation.add_voltage_level(voltage_level)
 
-        for typ in ns.EquipmentType.branch_types():
-            self.__process_branches(self._branches_df[typ], typ)
-
-        for typ in ns.EquipmentType.injection_types():
-            self.__process_injection(self._injections_df[typ], typ)
-
-        for three_windings_xf_idx, three_windings_xf_s in self._three_windings_transformers_df.iterrows():
-            three_windings_xf_id = str(three_windings_xf_idx)
-            voltage_level1_id = three_windings_xf_s.voltage_level1_id
-            voltage_level2_id = three_windings_xf_s.voltage_level2_id
-            voltage_level3_id = three_windings_xf_s.voltage_level3_id
-            voltage_level1 = self._voltage_levels[voltage_level1_id]
-            voltage_level2 = self._voltage_levels[voltage_level2_id]
-            voltage_level3 = self._voltage_levels[voltage_level3_id]
-            c1 = ns.Connection(self, voltage_level1, three_windings_xf_id, ns.EquipmentType.THREE_WINDINGS_TRANSFORMER,
-                               1,
-                               str(three_windings_xf_s['name']))
-            c2 = ns.Connection(self, voltage_level2, three_windings_xf_id, ns.EquipmentType.THREE_WINDINGS_TRANSFORMER,
-                               2,
-                               str(three_windings_xf_s['name']))
-            c3 = ns.Connection(self, voltage_level3, three_windings_xf_id, ns.EquipmentType.THREE_WINDINGS_TRANSFORMER,
-                               3,
-                               str(three_windings_xf_s['name']))
-            voltage_level1.add_connection(c1)
-            voltage_level2.add_connection(c2)
-            voltage_level3.add_connection(c3)
-            self._connections[(c1.equipment_id, c1.side)] = c1
-            self._connections[(c2.equipment_id, c2.side)] = c2
-            self._connections[(c3.equipment_id, c3.side)] = c3
-
-        for switch_idx, switch_s in self._switches_df.iterrows():
-            switch_id = str(switch_idx)
-            voltage_level_id = switch_s.voltage_level_id
-            voltage_level = self._voltage_levels[voltage_level_id]
-            c1 = ns.Connection(self, voltage_level, switch_id, ns.EquipmentType.SWITCH,
-                               1,
-                               str(switch_s['name']))
-            c2 = ns.Connection(self, voltage_level, switch_id, ns.EquipmentType.SWITCH,
-                               2,
-                               str(switch_s['name']))
-            voltage_level.add_connection(c1)
-            voltage_level.add_connection(c2)
-            self._connections[(c1.equipment_id, c1.side)] = c1
-            self._connections[(c2.equipment_id, c2.side)] = c2
+        if CONNECTION_TABLE in tables:
+            self._connection_table = ns.ConnectionTable.from_data_frame(self, list(self._voltage_levels.values()),
+                                                                        tables[CONNECTION_TABLE])
 
     @property
     def network(self) -> pn.Network:
         return self._network
 
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def data_version(self) -> int:
+        return self._data_version
+
+    @property
+    def topology_version(self) -> int:
+        return self._topology_version
+
+    def invalidate_topology(self) -> None:
+        self._topology_version += 1
+
+    def get_index(self, key: Any, builder: Callable[[], Any]) -> Any:
+        cached = self._indexes.get(key)
+        if cached is None or cached[0] != self._topology_version:
+            cached = (self._topology_version, builder())
+            self._indexes[key] = cached
+        return cached[1]
+
     @property
     def lf_components_results(self) -> list[lf.ComponentResult]:
         return self._lf_components_results
@@ -118,253 +227,486 @@ class NetworkStructure:
     @lf_components_results.setter
     def lf_components_results(self, value: list[lf.ComponentResult]) -> None:
         self._lf_components_results = value
+        self._tables_generation.pop('components', None)
+        self._data_version += 1
+
+    @property
+    def connection_table(self) -> 'ns.ConnectionTable':
+        if self._connection_table is None:
+            self._connection_table = self.__build_connection_table()
+        return self._connection_table
+
+    @property
+    def table_names(self) -> List[str]:
+        return list(self._table_loaders)
+
+    def get_table(self, name: str) -> pd.DataFrame:
+        if self._tables_generation.get(name) != self._generation:
+            logging.info(f'loading {name}...')
+            self.__set_table(name, self._table_loaders[name]())
+        return self._tables[name]
+
+    def __set_table(self, name: str, df: pd.DataFrame) -> None:
+        self._tables[name] = self.__compact_table(df) if self._compact else df
+        self._tables_generation[name] = self._generation
+
+    @property
+    def compact(self) -> bool:
+        return self._compact
+
+    def __compact_table(self, df: pd.DataFrame) -> pd.DataFrame:
+        columns = {}
+        for column in df.columns:
+            series = df[column]
+            if column in COMPACT_COLUMNS:
+                columns[column] = self.__to_categorical(COMPACT_COLUMNS[column], series)
+            elif pd.api.types.is_integer_dtype(series.dtype):
+                columns[column] = pd.to_numeric(series, downcast='integer')
+        if not columns:
+            return df
+        # copy, the replaced columns would otherwise stay referenced by views on the original blocks
+        return df.assign(**columns).copy()
+
+    def __to_categorical(self, dictionary: str, series: pd.Series) -> pd.Categorical:
+        values = series.to_numpy(dtype=object)
+        dtype = self._dictionaries.get(dictionary)
+        if dtype is None:
+            # voltage level and substation dictionaries reuse the index of their table
+            categories = pd.Index([], dtype=object)
+            if dictionary == 'voltage_level':
+                categories = self.voltage_levels_df.index
+            elif dictionary == 'substation':
+                categories = self.substations_df.index
+            dtype = pd.CategoricalDtype(categories)
+            self._dictionaries[dictionary] = dtype
+        new_values = pd.Index(values).dropna().unique().difference(dtype.categories, sort=False)
+        if len(new_values):
+            # a new dtype only when values are added, tables otherwise share the dtype and its categories
+            dtype = pd.CategoricalDtype(dtype.categories.append(new_values))
+            self._dictionaries[dictionary] = dtype
+        return pd.Categorical.from_codes(dtype.categories.get_indexer(values), dtype=dtype)
+
+    def get_snapshot_tables(self) -> Dict[str, pd.DataFrame]:
+        # all loaded tables and the connection table, to be restored with NetworkStructure(network, tables)
+        tables = {name: self._tables[name] for name in self._table_loaders if self.is_table_loaded(name)}
+        tables[CONNECTION_TABLE] = self.connection_table.to_data_frame()
+        return tables
+
+    def snapshot(self, names: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        # copies of the tables, all of them by default, to be compared later with diff
+        names = names or self.table_names
+        self.load_tables(names)
+        return {name: self.get_table(name).copy() for name in names}
+
+    def diff(self, before: Dict[str, pd.DataFrame], tolerances: Optional[Dict[str, float]] = None,
+             default_tolerance: float = ns.DEFAULT_TOLERANCE) -> pd.DataFrame:
+        # differences between a previous snapshot and the current tables, see ns.diff_snapshots
+        names = list(before)
+        self.load_tables(names)
+        return ns.diff_snapshots(before, {name: self.get_table(name) for name in names}, tolerances,
+                                 default_tolerance)
+
+    def load_tables(self, names: Optional[List[str]] = None, max_workers: Optional[int] = None) -> Dict[str, float]:
+        # issues the network getters of the tables not loaded yet concurrently, then merges the dependent tables.
+        # Returns the time spent in each getter.
+        names = [name for name in (names or self._table_loaders) if not self.is_table_loaded(name)]
+        getters = {name: self._merged_tables[name][0] if name in self._merged_tables else self._table_loaders[name]
+                   for name in names if name != 'components'}
+        timings: Dict[str, float] = {}
+
+        def timed_get(name: str, getter: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+            start = time.perf_counter()
+            df = getter()
+            timings[name] = time.perf_counter() - start
+            return df
+
+        logging.info(f'loading {len(getters)} tables concurrently...')
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {name: executor.submit(timed_get, name, getter) for name, getter in getters.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        for name, df in results.items():
+            if name not in self._merged_tables:
+                self.__set_table(name, df)
+        for name, (_, merge) in self._merged_tables.items():
+            if name in results:
+                self.__set_table(name, merge(results[name]))
+        if 'components' in names:
+            self.get_table('components')
+        logging.info('loading tables done')
+        return timings
+
+    def is_table_loaded(self, name: str) -> bool:
+        return self._tables_generation.get(name) == self._generation
+
+    def get_equipment_table(self, equipment_type: 'ns.EquipmentType') -> pd.DataFrame:
+        return self.get_table(self._equipment_tables[equipment_type][0])
 
     @property
     def areas(self) -> pd.DataFrame:
-        return self._areas_df
+        return self.get_table('areas')
 
     @property
     def areas_boundaries(self) -> pd.DataFrame:
-        return self._areas_boundaries_df
+        return self.get_table('areas_boundaries')
+
+    @property
+    def substations_df(self) -> pd.DataFrame:
+        return self.get_table('substations')
+
+    @property
+    def voltage_levels_df(self) -> pd.DataFrame:
+        return self.get_table('voltage_levels')
 
     @property
     def buses(self) -> pd.DataFrame:
-        return self._buses_df
+        return self.get_table('buses')
 
     @property
     def buses_bus_breaker_view(self) -> pd.DataFrame:
-        return self._buses_bus_breaker_view_df
+        return self.get_table('buses_bus_breaker_view')
 
     @property
     def generators(self) -> pd.DataFrame:
-        return self._injections_df[ns.EquipmentType.GENERATOR]
+        return self.get_table('generators')
 
     @property
     def loads(self) -> pd.DataFrame:
-        return self._injections_df[ns.EquipmentType.LOAD]
+        return self.get_table('loads')
 
     @property
     def lines(self) -> pd.DataFrame:
-        return self._branches_df[ns.EquipmentType.LINE]
+        return self.get_table('lines')
 
     @property
     def two_windings_transformers(self) -> pd.DataFrame:
-        return self._branches_df[ns.EquipmentType.TWO_WINDINGS_TRANSFORMER]
+        return self.get_table('two_windings_transformers')
 
     @property
     def dangling_lines(self) -> pd.DataFrame:
-        return self._injections_df[ns.EquipmentType.DANGLING_LINE]
+        return self.get_table('dangling_lines')
 
     @property
     def shunt_compensators(self) -> pd.DataFrame:
-        return self._injections_df[ns.EquipmentType.SHUNT_COMPENSATOR]
+        return self.get_table('shunt_compensators')
 
     @property
     def static_var_compensators(self) -> pd.DataFrame:
-        return self._injections_df[ns.EquipmentType.STATIC_VAR_COMPENSATOR]
+        return self.get_table('static_var_compensators')
 
     @property
     def lcc_hvdc(self) -> pd.DataFrame:
-        return self._injections_df[ns.EquipmentType.LCC_CONVERTER_STATION]
+        return self.get_table('lcc_converter_stations')
 
     @property
     def vsc_hvdc(self) -> pd.DataFrame:
-        return self._injections_df[ns.EquipmentType.VSC_CONVERTER_STATION]
+        return self.get_table('vsc_converter_stations')
 
     @property
     def three_windings_transformers(self) -> pd.DataFrame:
-        return self._three_windings_transformers_df
+        return self.get_table('three_windings_transformers')
 
     @property
     def switches(self) -> pd.DataFrame:
-        return self._switches_df
+        return self.get_table('switches')
 
     @property
     def tie_lines(self) -> pd.DataFrame:
-        return self._tie_lines_df
+        return self.get_table('tie_lines')
 
     @property
     def hvdc_lines(self) -> pd.DataFrame:
-        return self._hvdc_lines_df
+        return self.get_table('hvdc_lines')
 
     @property
     def components(self) -> pd.DataFrame:
-        return self._components_df
-
-    def refresh(self):
-        logging.info('refresh start')
+        return self.get_table('components')
+
+    def refresh(self, results_only: bool = False, concurrent: bool = False, incremental: bool = False):
+        # results_only: after a load flow, re-read only the results columns of the loaded tables
+        # incremental: re-read only the rows edited since the last refresh
+        # both fall back to a full refresh when the cached tables no longer match the network
+        # concurrent: reload all tables right away with load_tables instead of on next access
+        self._data_version += 1
+        partial = results_only or incremental
+        if incremental and not self.__refresh_dirty_rows():
+            partial = False
+        if partial and results_only and not self.__refresh_results():
+            partial = False
+        if partial:
+            return
+        logging.info('refresh, tables will be reloaded on next access')
+        self._dictionaries = {}
+        self._dirty_rows = {}
+        self._generation += 1
+        self.invalidate_topology()
+        if concurrent:
+            self.load_tables()
 
-        self._bus_breaker_topology_cache = {}
-
-        logging.info('get_areas...')
-        self._areas_df = self._network.get_areas(all_attributes=True)
-
-        logging.info('get_areas_boundaries...')
-        self._areas_boundaries_df = self._network.get_areas_boundaries(all_attributes=True)
-
-        logging.info('get_substations...')
-        self._substations_df = self._network.get_substations(all_attributes=True)
-
-        logging.info('get_voltage_levels...')
-        tmp = self._substations_df[['name', 'country']].rename(columns={'name': 'substation_name'})
-        self._voltage_levels_df = (self._network.get_voltage_levels(
+    @property
+    def dirty_version(self) -> int:
+        return self._dirty_version
+
+    def get_dirty_rows(self, name: str) -> Dict[str, set[str]]:
+        return {ident: set(columns) for ident, columns in self._dirty_rows.get(name, {}).items()}
+
+    def mark_dirty(self, name: str, ids: List[str], columns: List[str]) -> None:
+        rows = self._dirty_rows.setdefault(name, {})
+        for ident in ids:
+            rows.setdefault(ident, set()).update(columns)
+        self._dirty_version += 1
+        self._data_version += 1
+
+    def update_value(self, name: str, ident: str, column: str, value: Any) -> None:
+        # records an edit already applied to the network: patches the cached table and marks the row dirty,
+        # the row is re-read from the network on next incremental refresh
+        if self.is_table_loaded(name):
+            self._tables[name].loc[ident, column] = value
+        self.mark_dirty(name, [ident], [column])
+
+    def add_rows_changed_listener(self, listener: Callable[[str, List[str]], None]) -> None:
+        # called with the table name and the ids of the rows re-read by an incremental refresh
+        self._rows_changed_listeners.append(listener)
+
+    def __refresh_dirty_rows(self) -> bool:
+        # re-reads the dirty rows of the loaded tables with the network getters id filter and writes them in place.
+        # Returns False if an edit requires a full refresh.
+        for name, rows in self._dirty_rows.items():
+            columns = set().union(*rows.values())
+            if name in STRUCTURE_TABLES or columns & TOPOLOGY_COLUMNS:
+                logging.info(f'refresh dirty rows: {name} {sorted(columns)} edited, full refresh required')
+                return False
+        logging.info('refresh dirty rows start')
+        updates = []
+        for name, rows in self._dirty_rows.items():
+            if not self.is_table_loaded(name):
+                continue
+            rows_df = self._table_loaders[name](id=list(rows))
+            if not rows_df.index.isin(self._tables[name].index).all():
+                logging.info(f'refresh dirty rows: {name} rows not found, full refresh required')
+                return False
+            updates.append((name, rows_df))
+        for name, rows_df in updates:
+            self.__write_rows(name, rows_df)
+            if 'name' in set().union(*self._dirty_rows[name].values()):
+                self.__update_connection_names(name, rows_df)
+        changed = {name: list(rows) for name, rows in self._dirty_rows.items()}
+        self._dirty_rows = {}
+        for name, ids in changed.items():
+            for listener in self._rows_changed_listeners:
+                listener(name, ids)
+        logging.info('refresh dirty rows end')
+        return True
+
+    def __write_rows(self, name: str, rows_df: pd.DataFrame) -> None:
+        df = self._tables[name]
+        positions = df.index.get_indexer(rows_df.index)
+        for column in rows_df.columns:
+            values = rows_df[column].to_numpy()
+            dtype = df[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                if not pd.Index(values).dropna().isin(dtype.categories).all():
+                    # new values in compact mode, the column is re-encoded with the extended dictionary
+                    column_values = df[column].to_numpy(dtype=object)
+                    column_values[positions] = values
+                    df[column] = self.__to_categorical(COMPACT_COLUMNS[column], pd.Series(column_values))
+                    continue
+            elif pd.api.types.is_integer_dtype(dtype) and dtype != values.dtype:
+                # integer column downcast in compact mode, widened back if the new values do not fit
+                if len(values) and (values.min() < np.iinfo(dtype).min or values.max() > np.iinfo(dtype).max):
+                    df[column] = df[column].astype(values.dtype)
+                else:
+                    values = values.astype(dtype)
+            df.iloc[positions, df.columns.get_loc(column)] = values
+
+    def __update_connection_names(self, name: str, rows_df: pd.DataFrame) -> None:
+        if self._connection_table is None:
+            return
+        for typ, (table_name, _) in self._equipment_tables.items():
+            if table_name == name:
+                rows = self._connection_table.type_rows(typ)
+                positions = rows_df.index.get_indexer(self._connection_table.equipment_ids[rows])
+                found = positions >= 0
+                self._connection_table.names[rows[found]] = rows_df['name'].to_numpy(dtype=object)[positions[found]]
+                # renamed equipments are searched by their new name
+                self._search_index = None
+
+    def __refresh_results(self) -> bool:
+        # a load flow only changes flows, voltages and a few regulation outputs: re-read only these columns of the
+        # loaded tables and write them in place. Returns False if the network no longer matches the cached tables.
+        logging.info('refresh results start')
+        updates = []
+        for name, (getter, attributes) in self._table_results.items():
+            if not self.is_table_loaded(name):
+                continue
+            df = self._tables[name]
+            results_df = getter(attributes=attributes)
+            if not results_df.index.equals(df.index):
+                logging.info('refresh results: network structure changed, full refresh required')
+                return False
+            updates.append((df, results_df))
+        for df, results_df in updates:
+            # same index, positional write of each column
+            for column in results_df.columns:
+                df[column] = results_df[column].to_numpy()
+        self._tables_generation.pop('components', None)
+        logging.info('refresh results end')
+        return True
+
+    def __load_merged(self, name: str, **kwargs) -> pd.DataFrame:
+        getter, merge = self._merged_tables[name]
+        return merge(getter(**kwargs))
+
+    def __get_voltage_levels(self, **kwargs) -> pd.DataFrame:
+        return self._network.get_voltage_levels(
             attributes=['substation_id', 'name', 'nominal_v', 'low_voltage_limit', 'high_voltage_limit',
-                        'topology_kind'])
-                                   .reset_index()
-                                   .merge(tmp, left_on='substation_id', right_on='id', how='left')
-                                   .set_index('id'))[
+                        'topology_kind'], **kwargs)
+
+    def __get_switches(self, **kwargs) -> pd.DataFrame:
+        return self._network.get_switches(
+            attributes=['name', 'kind', 'open', 'retained', 'bus_breaker_bus1_id', 'bus_breaker_bus2_id',
+                        'voltage_level_id', 'fictitious'], **kwargs)
+
+    @staticmethod
+    def __add_retained_switch_buses(switches_df: pd.DataFrame) -> pd.DataFrame:
+        # buses of the switches drawn in the bus/breaker view, empty for switches that are not retained
+        retained = switches_df['retained'].to_numpy(dtype=bool)
+        return switches_df.assign(**{f'retained_bus{side}_id': np.where(retained,
+                                                                         switches_df[f'bus_breaker_bus{side}_id'],
+                                                                         '').astype(object)
+                                     for side in (1, 2)})
+
+    def __get_shunt_compensators(self, **kwargs) -> pd.DataFrame:
+        return self._network.get_shunt_compensators(
+            attributes=['name', 'connected', 'model_type', 'section_count', 'max_section_count',
+                        'voltage_regulation_on', 'target_v', 'target_deadband', 'p', 'q', 'i',
+                        'bus_id', 'bus_breaker_bus_id', 'voltage_level_id', 'fictitious'], **kwargs)
+
+    def __add_shunt_compensator_types(self, shunt_compensators_df: pd.DataFrame) -> pd.DataFrame:
+        # susceptance per section of linear shunts, first section of non linear ones:
+        # it is not supposed to be a different sign across sections.
+        b = pd.concat([self.get_table('linear_shunt_compensator_sections')['b_per_section'],
+                       self.get_table('non_linear_shunt_compensator_sections')['b'].groupby(level=0).first()])
+        b = b[~b.index.duplicated()].reindex(shunt_compensators_df.index).to_numpy()
+        shunt_types = np.where(b > 0, str(ns.ShuntCompensatorType.CAPACITOR), str(ns.ShuntCompensatorType.REACTOR))
+        return shunt_compensators_df.assign(shunt_type=shunt_types.astype(object))
+
+    def __merge_substations(self, voltage_levels_df: pd.DataFrame) -> pd.DataFrame:
+        tmp = self.substations_df[['name', 'country']].rename(columns={'name': 'substation_name'})
+        return (voltage_levels_df
+                .reset_index()
+                .merge(tmp, left_on='substation_id', right_on='id', how='left')
+                .set_index('id'))[
             ['name', 'country', 'substation_id', 'substation_name', 'nominal_v', 'low_voltage_limit',
              'high_voltage_limit', 'topology_kind']]
 
-        logging.info('get_buses')
-        tmp = self._voltage_levels_df[
+    def __merge_voltage_levels(self, buses_df: pd.DataFrame) -> pd.DataFrame:
+        tmp = self.voltage_levels_df[
             ['name', 'country', 'substation_id', 'substation_name', 'nominal_v', 'low_voltage_limit',
              'high_voltage_limit']].rename(columns={'name': 'voltage_level_name'})
-        self._buses_df = (self._network.get_buses()
-                          .reset_index()
-                          .merge(tmp, left_on='voltage_level_id', right_on='id', how='left')
-                          .set_index('id'))
-
-        logging.info('building components ...')
-        components = list(zip(self._buses_df.connected_component, self._buses_df.synchronous_component))
-        components.sort()
+        return (buses_df
+                .reset_index()
+                .merge(tmp, left_on='voltage_level_id', right_on='id', how='left')
+                .set_index('id'))
+
+    def __build_components(self) -> pd.DataFrame:
+        buses_df = self.buses
+        bus_counts = buses_df.groupby(['connected_component', 'synchronous_component'], dropna=False).size()
         components = [f'CC{connected_component} SC{synchronous_component}'
-                      for (connected_component, synchronous_component) in components]
-        df = pd.DataFrame(index=components)
-        df = df[~df.index.duplicated(keep='first')]
-        new_columns = {'status': [''] * len(df),
-                       'status_text': [''] * len(df),
-                       'iteration_count': [np.nan] * len(df),
-                       'reference_bus_id': [''] * len(df),
-                       'slack_buses_ids': [''] * len(df),
-                       'active_power_mismatch': [np.nan] * len(df),
-                       'distributed_active_power': [np.nan] * len(df),
-                       }
-        self._components_df = df.assign(**new_columns)
-
-        for cr in self._lf_components_results:
-            cid = f'CC{cr.connected_component_num} SC{cr.synchronous_component_num}'
-            self._components_df.loc[cid, 'status'] = cr.status.name
-            self._components_df.loc[cid, 'status_text'] = cr.status_text
-            self._components_df.loc[cid, 'iteration_count'] = cr.iteration_count
-            self._components_df.loc[cid, 'reference_bus_id'] = cr.reference_bus_id
-            self._components_df.loc[cid, 'slack_buses_ids'] = ','.join([sbr.id for sbr in cr.slack_bus_results])
-            self._components_df.loc[cid, 'active_power_mismatch'] = (
-                sum(sbr.active_power_mismatch for sbr in cr.slack_bus_results)
-            )
-            self._components_df.loc[cid, 'distributed_active_power'] = cr.distributed_active_power
-
-        logging.info('get_bus_breaker_view_buses')
-        self._buses_bus_breaker_view_df = (self._network.get_bus_breaker_view_buses()
-                                           .reset_index()
-                                           .merge(tmp, left_on='voltage_level_id', right_on='id', how='left')
-                                           .set_index('id'))
-
-        logging.info('get_lines')
-        self._branches_df[ns.EquipmentType.LINE] = self._network.get_lines(
-            attributes=['name', 'connected1', 'connected2', 'p1', 'q1', 'i1', 'p2', 'q2', 'i2', 'bus1_id',
-                        'bus_breaker_bus1_id', 'voltage_level1_id', 'bus2_id', 'bus_breaker_bus2_id',
-                        'voltage_level2_id'])
-
-        logging.info('get_2_windings_transformers')
-        self._branches_df[ns.EquipmentType.TWO_WINDINGS_TRANSFORMER] = self._network.get_2_windings_transformers(
-            attributes=['name', 'connected1', 'connected2', 'p1', 'q1', 'i1', 'p2', 'q2', 'i2', 'bus1_id',
-                        'bus_breaker_bus1_id', 'voltage_level1_id', 'bus2_id', 'bus_breaker_bus2_id',
-                        'voltage_level2_id'])
-
-        logging.info('get_3_windings_transformers...')
-        self._three_windings_transformers_df = self._network.get_3_windings_transformers(
-            attributes=['name', 'connected1', 'connected2', 'connected3', 'p1', 'q1', 'i1', 'p2', 'q2', 'i2', 'p3',
-                        'q3', 'i3', 'bus1_id', 'bus_breaker_bus1_id', 'voltage_level1_id', 'bus2_id',
-                        'bus_breaker_bus2_id', 'voltage_level2_id', 'bus3_id', 'bus_breaker_bus3_id',
-                        'voltage_level3_id'])
-
-        logging.info('get_tie_lines...')
-        self._tie_lines_df = self._network.get_tie_lines(all_attributes=True)
-
-        logging.info('get_switches...')
-        self._switches_df = self._network.get_switches(
-            attributes=['name', 'kind', 'open', 'retained',
-                        'bus_breaker_bus1_id', 'bus_breaker_bus2_id', 'voltage_level_id', 'fictitious'])
-
-        logging.info('get_loads...')
-        self._injections_df[ns.EquipmentType.LOAD] = self._network.get_loads(
-            attributes=['name', 'connected', 'type', 'p0', 'q0', 'p', 'q', 'i',
-                        'bus_id', 'bus_breaker_bus_id', 'voltage_level_id', 'fictitious'])
-
-        logging.info('get_generators...')
-        self._injections_df[ns.EquipmentType.GENERATOR] = self._network.get_generators(
-            attributes=['name', 'connected', 'energy_source', 'target_p', 'min_p', 'max_p',
-                        'voltage_regulator_on', 'target_q', 'target_v', 'p', 'q', 'i',
-                        'bus_id', 'bus_breaker_bus_id', 'voltage_level_id', 'fictitious'])
-
-        logging.info('get_dangling_lines...')
-        self._injections_df[ns.EquipmentType.DANGLING_LINE] = self._network.get_dangling_lines(
-            attributes=['name', 'connected', 'p0', 'q0', 'p', 'q', 'i', 'boundary_p', 'boundary_q', 'boundary_v_mag',
-                        'boundary_v_angle', 'bus_id', 'bus_breaker_bus_id', 'voltage_level_id', 'pairing_key', 'paired',
-                        'tie_line_id', 'fictitious'])
-
-        logging.info('get_shunt_compensators...')
-        self._injections_df[ns.EquipmentType.SHUNT_COMPENSATOR] = self._network.get_shunt_compensators(
-            attributes=['name', 'connected', 'model_type', 'section_count', 'max_section_count',
-                        'voltage_regulation_on', 'target_v', 'target_deadband', 'p', 'q', 'i',
-                        'bus_id', 'bus_breaker_bus_id', 'voltage_level_id', 'fictitious'])
-
-        logging.info('get_static_var_compensators...')
-        self._injections_df[ns.EquipmentType.STATIC_VAR_COMPENSATOR] = self._network.get_static_var_compensators(
-            all_attributes=True)
-
-        logging.info('get_lcc_converter_stations...')
-        self._injections_df[ns.EquipmentType.LCC_CONVERTER_STATION] = self._network.get_lcc_converter_stations(
-            all_attributes=True)
-
-        logging.info('get_vsc_converter_stations...')
-        self._injections_df[ns.EquipmentType.VSC_CONVERTER_STATION] = self._network.get_vsc_converter_stations(
-            all_attributes=True)
-
-        logging.info('get_linear_shunt_compensator_sections')
-        self._linear_shunt_compensator_sections_df = self._network.get_linear_shunt_compensator_sections(
-            all_attributes=True)
-
-        logging.info('get_non_linear_shunt_compensator_sections')
-        self._non_linear_shunt_compensator_sections_df = self._network.get_non_linear_shunt_compensator_sections(
-            all_attributes=True)
-
-        logging.info('get_hvdc_lines')
-        self._hvdc_lines_df = self._network.get_hvdc_lines(all_attributes=True)
-
-        logging.info('refresh end')
-
-    def __process_injection(self, injections_df, injection_type: ns.EquipmentType) -> None:
-        for injection_idx, injection_s in injections_df.iterrows():
-            injection_id = str(injection_idx)
-            voltage_level_id = injection_s.voltage_level_id
-            voltage_level = self._voltage_levels[voltage_level_id]
-            c1 = ns.Connection(self, voltage_level, injection_id, injection_type, None, injection_s['name'])
-            voltage_level.add_connection(c1)
-            self._connections[(c1.equipment_id, c1.side)] = c1
-
-    def __process_branches(self, branches_df, branch_type: ns.EquipmentType) -> None:
-        for branch_idx, branches_s in branches_df.iterrows():
-            branch_id = str(branch_idx)
-            voltage_level1_id = branches_s.voltage_level1_id
-            voltage_level2_id = branches_s.voltage_level2_id
-            voltage_level1 = self._voltage_levels[voltage_level1_id]
-            voltage_level2 = self._voltage_levels[voltage_level2_id]
-            c1 = ns.Connection(self, voltage_level1, branch_id, branch_type, 1, branches_s['name'])
-            c2 = ns.Connection(self, voltage_level2, branch_id, branch_type, 2, branches_s['name'])
-            voltage_level1.add_connection(c1)
-            voltage_level2.add_connection(c2)
-            self._connections[(c1.equipment_id, c1.side)] = c1
-            self._connections[(c2.equipment_id, c2.side)] = c2
+                      for (connected_component, synchronous_component) in bus_counts.index]
+        bus_counts.index = pd.Index(components)
+
+        # load flow results, column-wise, with the default used for components without result
+        results = self._lf_components_results
+        results_columns = {
+            'status': ([cr.status.name for cr in results], ''),
+            'status_text': ([cr.status_text for cr in results], ''),
+            'iteration_count': ([cr.iteration_count for cr in results], np.nan),
+            'reference_bus_id': ([cr.reference_bus_id for cr in results], ''),
+            'slack_buses_ids': ([','.join([sbr.id for sbr in cr.slack_bus_results]) for cr in results], ''),
+            'active_power_mismatch': ([sum(sbr.active_power_mismatch for sbr in cr.slack_bus_results)
+                                       for cr in results], np.nan),
+            'distributed_active_power': ([cr.distributed_active_power for cr in results], np.nan),
+        }
+        results_index = pd.Index([f'CC{cr.connected_component_num} SC{cr.synchronous_component_num}'
+                                  for cr in results])
+        # the last result wins for a component reported twice
+        last_results = ~results_index.duplicated(keep='last')
+        results_index = results_index[last_results]
+
+        index = bus_counts.index.append(results_index.difference(bus_counts.index, sort=False))
+        components_df = pd.DataFrame({
+            column: pd.Series(values, dtype=object if default == '' else float)[last_results].set_axis(
+                results_index).reindex(index, fill_value=default)
+            for column, (values, default) in results_columns.items()}, index=index)
+        components_df['bus_count'] = bus_counts.reindex(index, fill_value=0)
+        return components_df
+
+    def __build_connection_table(self) -> 'ns.ConnectionTable':
+        logging.info('building connection table...')
+        connection_table = ns.ConnectionTable(self, list(self._voltage_levels.values()))
+        branch_columns = ['voltage_level1_id', 'voltage_level2_id']
+        for typ in ns.EquipmentType.branch_types():
+            connection_table.add_equipments(typ, self.__connection_source(typ, branch_columns), [1, 2], branch_columns)
+        for typ in ns.EquipmentType.injection_types():
+            connection_table.add_equipments(typ, self.__connection_source(typ, ['voltage_level_id']),
+                                            [None], ['voltage_level_id'])
+        three_windings_columns = ['voltage_level1_id', 'voltage_level2_id', 'voltage_level3_id']
+        connection_table.add_equipments(ns.EquipmentType.THREE_WINDINGS_TRANSFORMER,
+                                        self.__connection_source(ns.EquipmentType.THREE_WINDINGS_TRANSFORMER,
+                                                                 three_windings_columns),
+                                        [1, 2, 3], three_windings_columns)
+        connection_table.add_equipments(ns.EquipmentType.SWITCH,
+                                        self.__connection_source(ns.EquipmentType.SWITCH, ['voltage_level_id']),
+                                        [1, 2], ['voltage_level_id', 'voltage_level_id'])
+        connection_table.build()
+        return connection_table
+
+    def __connection_source(self, equipment_type: 'ns.EquipmentType', voltage_level_columns: List[str]) \
+            -> pd.DataFrame:
+        # the connection table only needs ids, names and voltage levels: do not load the full table if not loaded yet
+        name, getter = self._equipment_tables[equipment_type]
+        if self.is_table_loaded(name):
+            return self._tables[name]
+        return getter(attributes=['name'] + voltage_level_columns)
 
     @property
     def substations(self) -> 'List[ns.Substation]':
-        return sorted(self._substations.values(), key=lambda s: s.name)
+        return list(self.get_index('sorted_substations', self.__sort_substations))
 
     @property
     def voltage_levels(self) -> 'List[ns.VoltageLevel]':
-        return sorted(self._voltage_levels.values(), key=lambda vl: (-vl.get_data().nominal_v, vl.name))
+        return list(self.get_index('sorted_voltage_levels', self.__sort_voltage_levels))
+
+    def get_substation_voltage_levels(self, substation: 'ns.Substation') -> 'List[ns.VoltageLevel]':
+        return list(self.get_index('substation_voltage_levels',
+                                   self.__group_substation_voltage_levels).get(substation.substation_id, []))
+
+    def __nominal_voltages(self, voltage_levels: 'List[ns.VoltageLevel]') -> np.ndarray:
+        return self.voltage_levels_df['nominal_v'].reindex([vl.voltage_level_id for vl in voltage_levels]).to_numpy()
+
+    def __sort_substations(self) -> 'List[ns.Substation]':
+        substations = list(self._substations.values())
+        names = np.array([s.name for s in substations], dtype=object)
+        return [substations[i] for i in np.argsort(names, kind='stable')]
+
+    def __sort_voltage_levels(self) -> 'List[ns.VoltageLevel]':
+        # nominal voltage descending, then name
+        voltage_levels = list(self._voltage_levels.values())
+        keys = pd.DataFrame({'nominal_v': self.__nominal_voltages(voltage_levels),
+                             'name': [vl.name for vl in voltage_levels]})
+        order = keys.sort_values(['nominal_v', 'name'], ascending=[False, True], kind='stable').index
+        return [voltage_levels[i] for i in order]
+
+    def __group_substation_voltage_levels(self) -> 'Dict[str, List[ns.VoltageLevel]]':
+        # nominal voltage descending, insertion order for equal voltages
+        voltage_levels = list(self._voltage_levels.values())
+        order = np.argsort(-self.__nominal_voltages(voltage_levels), kind='stable')
+        substation_voltage_levels = {}
+        for i in order:
+            voltage_level = voltage_levels[i]
+            if voltage_level.substation:
+                substation_voltage_levels.setdefault(voltage_level.substation.substation_id, []).append(voltage_level)
+        return substation_voltage_levels
 
     def get_substation(self, substation_id: str) -> 'Optional[ns.Substation]':
         if substation_id in self._substations:
@@ -386,86 +728,197 @@ class NetworkStructure:
         raise RuntimeError(f'{object_id} is not a known Substation or VoltageLevel')
 
     def get_connection(self, connection_id: str, side: Optional[int]) -> 'Optional[ns.Connection]':
-        if (connection_id, side) in self._connections:
-            return self._connections[(connection_id, side)]
-        return None
+        return self.connection_table.get_connection(self.connection_table.find(connection_id, side))
 
     def get_voltage_level_data(self, voltage_level: 'ns.VoltageLevel') -> pd.DataFrame:
-        return self._voltage_levels_df.loc[voltage_level.voltage_level_id]
+        return self.voltage_levels_df.loc[voltage_level.voltage_level_id]
 
     def get_connection_data(self, connection_id: str, side: Optional[int]) -> pd.DataFrame:
-        connection = self._connections[(connection_id, side)]
+        connection = self.get_connection(connection_id, side)
         if not connection:
             return pd.Series()
         typ = connection.equipment_type
-        if typ in ns.EquipmentType.branch_types():
-            df = self._branches_df[typ]
-        elif typ in ns.EquipmentType.injection_types():
-            df = self._injections_df[typ]
-        elif typ == ns.EquipmentType.THREE_WINDINGS_TRANSFORMER:
-            df = self._three_windings_transformers_df
-        else:
+        if typ == ns.EquipmentType.SWITCH:
             raise RuntimeError(f'No dataframe for connection {connection_id} of type {typ}')
-
-        return df.loc[connection.equipment_id]
+        return self.get_equipment_table(typ).loc[connection.equipment_id]
+
+    def get_connections_values(self, connections: List['ns.Connection']) -> np.recarray:
+        connection_table = self.connection_table
+        rows = np.fromiter((c.row for c in connections), dtype=np.int64, count=len(connections))
+        values = np.recarray(len(rows), dtype=CONNECTION_VALUES_DTYPE)
+        values.p = np.nan
+        values.q = np.nan
+        values.i = np.nan
+        values.connected = True
+        values.bus_id = ''
+        values.bus_breaker_bus_id = ''
+        type_codes = connection_table.type_codes[rows]
+        sides = connection_table.sides[rows]
+        for type_code in np.unique(type_codes):
+            positions = np.flatnonzero(type_codes == type_code)
+            typ = connection_table.equipment_type(rows[positions[0]])
+            df = self.get_equipment_table(typ)
+            df_positions = df.index.get_indexer(connection_table.equipment_ids[rows[positions]])
+            for side in np.unique(sides[positions]):
+                side_char = '' if side == ns.NO_SIDE else str(side)
+                side_mask = sides[positions] == side
+                targets = positions[side_mask]
+                sources = df_positions[side_mask]
+                if typ == ns.EquipmentType.SWITCH:
+                    values.bus_breaker_bus_id[targets] = df[f'retained_bus{side_char}_id'].to_numpy()[sources]
+                    continue
+                for field, column in [('p', 'p'), ('q', 'q'), ('i', 'i'), ('connected', 'connected'),
+                                      ('bus_id', 'bus'), ('bus_breaker_bus_id', 'bus_breaker_bus')]:
+                    column = f'{column}{side_char}_id' if field.endswith('bus_id') else f'{column}{side_char}'
+                    values[field][targets] = df[column].to_numpy()[sources]
+        return values
+
+    def get_voltage_level_buses(self, voltage_level: 'ns.VoltageLevel', bus_view: 'ns.BusView') -> pd.DataFrame:
+        df = None
+        match bus_view:
+            case ns.BusView.BUS_BRANCH:
+                df = self.buses
+            case ns.BusView.BUS_BREAKER:
+                df = self.buses_bus_breaker_view
+        # positional rows per voltage level, valid as long as the table is not reloaded
+        positions = self.get_index(('voltage_level_buses', bus_view),
+                                   lambda: df.groupby('voltage_level_id', sort=False, observed=True).indices)
+        return df.iloc[positions.get(voltage_level.voltage_level_id, np.empty(0, dtype=np.intp))]
+
+    def get_bus_connections(self, voltage_level: 'ns.VoltageLevel', bus_view: 'ns.BusView',
+                            bus_id: str) -> List['ns.Connection']:
+        rows = self.get_index(('bus_connections', bus_view),
+                              lambda: self.__build_bus_connections_index(bus_view)).get(bus_id, [])
+        return self.connection_table.get_connections(rows)
+
+    def __build_bus_connections_index(self, bus_view: 'ns.BusView') -> Dict[str, np.ndarray]:
+        # bus id of every connection, gathered per equipment type and side in one pass,
+        # switches only have a bus in the bus/breaker view, when retained
+        logging.info(f'building {bus_view} bus connections index...')
+        connection_table = self.connection_table
+        prefix = 'bus_breaker_' if bus_view == ns.BusView.BUS_BREAKER else ''
+        bus_ids = np.full(len(connection_table), '', dtype=object)
+        for typ in self._equipment_tables:
+            column_prefix = prefix
+            if typ == ns.EquipmentType.SWITCH:
+                if bus_view != ns.BusView.BUS_BREAKER:
+                    continue
+                column_prefix = 'retained_'
+            rows = connection_table.type_rows(typ)
+            if len(rows) == 0:
+                continue
+            df = self.get_equipment_table(typ)
+            positions = df.index.get_indexer(connection_table.equipment_ids[rows])
+            sides = connection_table.sides[rows]
+            for side in np.unique(sides):
+                side_char = '' if side == ns.NO_SIDE else str(side)
+                mask = sides == side
+                bus_ids[rows[mask]] = df[f'{column_prefix}bus{side_char}_id'].to_numpy()[positions[mask]]
+        return {bus_id: rows for bus_id, rows in pd.Series(bus_ids).groupby(bus_ids, sort=False).indices.items()
+                if bus_id}
 
     def get_shunt_compensator_type(self, connection: ns.Connection) -> 'ns.ShuntCompensatorType':
         if connection.equipment_type != ns.EquipmentType.SHUNT_COMPENSATOR:
             raise RuntimeError('Not a shunt compensator')
-        model_type = self._injections_df[ns.EquipmentType.SHUNT_COMPENSATOR].loc[connection.equipment_id]['model_type']
-        if model_type == 'LINEAR':
-            b = self._linear_shunt_compensator_sections_df.loc[connection.equipment_id]['b_per_section']
-        else:
-            # just take the first section. it is not supposed to be a different sign across sections.
-            b = self._non_linear_shunt_compensator_sections_df.loc[(connection.equipment_id, 0)]['b']
-        if b > 0:
-            return ns.ShuntCompensatorType.CAPACITOR
-        return ns.ShuntCompensatorType.REACTOR
+        return ns.ShuntCompensatorType(self.shunt_compensators.at[connection.equipment_id, 'shunt_type'])
 
     def is_retained(self, connection: ns.Connection) -> bool:
         if connection.equipment_type != ns.EquipmentType.SWITCH:
             raise RuntimeError('Not a switch')
-        return bool(self._switches_df.loc[connection.equipment_id]['retained'])
+        return bool(self.switches.loc[connection.equipment_id]['retained'])
+
+    def get_retained_switch_bus_id(self, connection: ns.Connection) -> str:
+        if connection.equipment_type != ns.EquipmentType.SWITCH:
+            raise RuntimeError('Not a switch')
+        return str(self.switches.at[connection.equipment_id, f'retained_bus{connection.side}_id'])
 
     def is_open(self, connection: ns.Connection) -> bool:
         if connection.equipment_type != ns.EquipmentType.SWITCH:
             raise RuntimeError('Not a switch')
-        return bool(self._switches_df.loc[connection.equipment_id]['open'])
+        return bool(self.switches.loc[connection.equipment_id]['open'])
 
     def get_other_sides(self, connection: ns.Connection) -> List[ns.Connection]:
         if connection.equipment_type in ns.EquipmentType.branch_types() or connection.equipment_type == ns.EquipmentType.SWITCH:
             other_side_num = 1 if connection.side == 2 else 2
-            return [self._connections[(connection.equipment_id, other_side_num)]]
-        elif connection.equipment_type == ns.EquipmentType.THREE_WINDINGS_TRANSFORMER:
-            other_sides = []
-            for i in range(1, 4):
-                if i != connection.side and (connection.equipment_id, i) in self._connections:
-                    other_sides.append(self._connections[(connection.equipment_id, i)])
-            return other_sides
-        elif connection.equipment_type == ns.EquipmentType.DANGLING_LINE:
-            return self._get_other_side_from_df(connection, self._tie_lines_df, 'dangling_line1_id',
-                                                'dangling_line2_id')
-        elif connection.equipment_type in [ns.EquipmentType.LCC_CONVERTER_STATION,
-                                           ns.EquipmentType.VSC_CONVERTER_STATION]:
-            return self._get_other_side_from_df(connection, self._hvdc_lines_df, 'converter_station1_id',
-                                                'converter_station2_id')
-        return []
-
-    def _get_other_side_from_df(self, connection: ns.Connection, data_frame: pd.DataFrame, col1: str, col2: str) -> \
-            List[ns.Connection]:
-        for _, series in data_frame.iterrows():
-            eq1 = str(series[col1])
-            eq2 = str(series[col2])
-            if connection.equipment_id == eq1:
-                return [self._connections[(eq2, None)]]
-            elif connection.equipment_id == eq2:
-                return [self._connections[(eq1, None)]]
-        return []
+            return [self.get_connection(connection.equipment_id, other_side_num)]
+        other_sides = self.get_index('other_sides', self.__build_other_sides_index)
+        return self.connection_table.get_connections(other_sides.get(connection.row, []))
+
+    def __build_other_sides_index(self) -> Dict[int, List[int]]:
+        # connection row -> rows of the other sides, for three windings transformer legs,
+        # dangling lines paired in tie lines and converter stations paired in HVDC lines
+        connection_table = self.connection_table
+        other_sides: Dict[int, List[int]] = {}
+        legs = connection_table.type_rows(ns.EquipmentType.THREE_WINDINGS_TRANSFORMER).reshape(-1, 3).tolist()
+        for leg1, leg2, leg3 in legs:
+            other_sides[leg1] = [leg2, leg3]
+            other_sides[leg2] = [leg1, leg3]
+            other_sides[leg3] = [leg1, leg2]
+        for df, col1, col2 in [(self.tie_lines, 'dangling_line1_id', 'dangling_line2_id'),
+                               (self.hvdc_lines, 'converter_station1_id', 'converter_station2_id')]:
+            rows1 = connection_table.find_rows(df[col1].to_numpy())
+            rows2 = connection_table.find_rows(df[col2].to_numpy())
+            paired = (rows1 >= 0) & (rows2 >= 0)
+            for row1, row2 in zip(rows1[paired].tolist(), rows2[paired].tolist()):
+                other_sides[row1] = [row2]
+                other_sides[row2] = [row1]
+        return other_sides
+
+    @property
+    def search_index(self) -> 'ns.SearchIndex':
+        if self._search_index is None:
+            self._search_index = ns.SearchIndex(self)
+        return self._search_index
+
+    def get_bus_graph(self, bus_view: 'ns.BusView') -> 'ns.BusGraph':
+        return self.get_index(('bus_graph', bus_view), lambda: self.__build_bus_graph(bus_view))
+
+    def get_neighbourhood_voltage_levels(self, root_id: str, depth: int,
+                                         bus_view: 'ns.BusView' = ns.BusView.BUS_BRANCH) -> List[str]:
+        # ids of the voltage levels having a bus at most depth edges away from the buses of the root substation or
+        # voltage level, the root voltage levels first. Not memoized: only the bus graph is, the search is cheap.
+        root = self.get_substation_or_voltage_level(root_id)
+        root_voltage_levels = root.voltage_levels if isinstance(root, ns.Substation) else [root]
+        root_voltage_level_ids = [vl.voltage_level_id for vl in root_voltage_levels]
+        if not root_voltage_levels:
+            # substation without voltage level, no bus to start from
+            return root_voltage_level_ids
+        graph = self.get_bus_graph(bus_view)
+        buses_df = self.buses if bus_view == ns.BusView.BUS_BRANCH else self.buses_bus_breaker_view
+        sources = graph.bus_ids.get_indexer(pd.concat([self.get_voltage_level_buses(vl, bus_view)
+                                                       for vl in root_voltage_levels]).index)
+        positions = graph.bfs(sources[sources >= 0], depth)
+        voltage_level_ids = buses_df['voltage_level_id'].to_numpy(dtype=object)[positions]
+        return pd.unique(np.concatenate([root_voltage_level_ids, voltage_level_ids]).astype(object)).tolist()
+
+    def __build_bus_graph(self, bus_view: 'ns.BusView') -> 'ns.BusGraph':
+        # edges of lines, transformers (3 windings transformers as a triangle), tie lines and HVDC lines,
+        # and in the bus/breaker view of closed retained switches
+        logging.info(f'building {bus_view} bus graph...')
+        prefix = 'bus_breaker_' if bus_view == ns.BusView.BUS_BREAKER else ''
+        edges: List[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        for df in [self.lines, self.two_windings_transformers]:
+            edges.append((df[f'{prefix}bus1_id'].to_numpy(), df[f'{prefix}bus2_id'].to_numpy(), df.index.to_numpy()))
+        df = self.three_windings_transformers
+        for side1, side2 in [(1, 2), (1, 3), (2, 3)]:
+            edges.append((df[f'{prefix}bus{side1}_id'].to_numpy(), df[f'{prefix}bus{side2}_id'].to_numpy(),
+                          df.index.to_numpy()))
+        # tie lines and HVDC lines ends are the buses of their dangling lines and converter stations
+        dangling_line_buses = self.dangling_lines[f'{prefix}bus_id']
+        edges.append((dangling_line_buses.reindex(self.tie_lines['dangling_line1_id']).to_numpy(),
+                      dangling_line_buses.reindex(self.tie_lines['dangling_line2_id']).to_numpy(),
+                      self.tie_lines.index.to_numpy()))
+        converter_station_buses = pd.concat([self.lcc_hvdc[f'{prefix}bus_id'], self.vsc_hvdc[f'{prefix}bus_id']])
+        edges.append((converter_station_buses.reindex(self.hvdc_lines['converter_station1_id']).to_numpy(),
+                      converter_station_buses.reindex(self.hvdc_lines['converter_station2_id']).to_numpy(),
+                      self.hvdc_lines.index.to_numpy()))
+        if bus_view == ns.BusView.BUS_BREAKER:
+            df = self.switches[~self.switches['open'].to_numpy(dtype=bool)]
+            edges.append((df['retained_bus1_id'].to_numpy(), df['retained_bus2_id'].to_numpy(),
+                          df.index.to_numpy()))
+        buses_df = self.buses if bus_view == ns.BusView.BUS_BRANCH else self.buses_bus_breaker_view
+        return ns.BusGraph(buses_df.index,
+                           *(np.concatenate([edge[i] for edge in edges]).astype(object) for i in range(3)))
 
     def get_bus_breaker_topology(self, voltage_level: 'ns.VoltageLevel') -> pn.BusBreakerTopology:
-        voltage_level_id: str = voltage_level.voltage_level_id
-        if voltage_level_id in self._bus_breaker_topology_cache:
-            return self._bus_breaker_topology_cache[voltage_level_id]
-        topo = self.network.get_bus_breaker_topology(voltage_level_id)
-        self._bus_breaker_topology_cache[voltage_level_id] = topo
-        return topo
+        return self.network.get_bus_breaker_topology(voltage_level.voltage_level_id)
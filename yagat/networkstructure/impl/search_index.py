@@ -0,0 +1,199 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+import yagat.networkstructure as ns
+
+SUBSTATION = 'substation'
+VOLTAGE_LEVEL = 'voltage_level'
+# separates ids and names in the indexed text, never part of a match
+SEPARATOR = 0
+
+
+class SearchHit:
+    def __init__(self, object_type: str, object_id: str, name: str, voltage_level_id: Optional[str] = None,
+                 connection: 'Optional[ns.Connection]' = None):
+        self._object_type = object_type
+        self._object_id = object_id
+        self._name = name
+        self._voltage_level_id = voltage_level_id
+        self._connection = connection
+
+    @property
+    def object_type(self) -> str:
+        # 'substation', 'voltage_level' or the ns.EquipmentType of an equipment
+        return self._object_type
+
+    @property
+    def object_id(self) -> str:
+        return self._object_id
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def voltage_level_id(self) -> Optional[str]:
+        return self._voltage_level_id
+
+    @property
+    def connection(self) -> 'Optional[ns.Connection]':
+        return self._connection
+
+    @property
+    def selection(self) -> tuple[str, str, 'Optional[ns.Connection]']:
+        # AppContext selection showing the hit, an equipment is shown in the voltage level of its first side
+        if self._connection:
+            return VOLTAGE_LEVEL, self._voltage_level_id, self._connection
+        return self._object_type, self._object_id, None
+
+    def __repr__(self) -> str:
+        return f'SearchHit({self._object_type}, {self._object_id})'
+
+
+# Case-insensitive substring search over ids and names of substations, voltage levels and equipments.
+# Ids and names are concatenated in a single lower case UTF-8 buffer. Byte trigrams are indexed by position:
+# a query is matched at the occurrences of its rarest trigram, checked against all its other trigrams at once.
+class SearchIndex:
+
+    def __init__(self, network_structure: 'ns.NetworkStructure'):
+        self._network_structure = network_structure
+        connection_table = network_structure.connection_table
+        substations = network_structure.substations
+        voltage_levels = network_structure.voltage_levels
+        # equipments by their first connection row
+        rows = np.flatnonzero(connection_table.sides <= 1)
+        equipment_types = np.array([str(typ) for typ in ns.EquipmentType], dtype=object)
+        self._object_types = np.concatenate([np.array([SUBSTATION] * len(substations) +
+                                                      [VOLTAGE_LEVEL] * len(voltage_levels), dtype=object),
+                                             equipment_types[connection_table.type_codes[rows]]])
+        self._ids = np.array([s.substation_id for s in substations] + [vl.voltage_level_id for vl in voltage_levels] +
+                             connection_table.equipment_ids[rows].tolist(), dtype=object)
+        names = pd.Series([s.name for s in substations] + [vl.name for vl in voltage_levels] +
+                          connection_table.names[rows].tolist(), dtype=object)
+        self._names = names.fillna('').to_numpy(dtype=object)
+        # connection row of equipments, -1 for substations and voltage levels
+        self._rows = np.concatenate([np.full(len(substations) + len(voltage_levels), -1, dtype=np.int64), rows])
+        self._substation_count = len(substations)
+        self._voltage_level_count = len(voltage_levels)
+
+        text = '\0'.join(f'{object_id}\0{name}' for object_id, name in zip(self._ids, self._names)) + '\0'
+        self._data = np.frombuffer(text.lower().encode('utf-8'), dtype=np.uint8)
+        separators = self._data == SEPARATOR
+        # two separators per object: after its id and after its name
+        self._owners = ((np.cumsum(separators) - separators) // 2).astype(np.int32)
+        # start of each object in the buffer, and end of the buffer
+        self._offsets = np.concatenate(([0], np.flatnonzero(separators)[1::2] + 1))
+        self._grams = self.__trigrams(self._data)
+        valid = np.flatnonzero(self._grams >= 0)
+        order = np.argsort(self._grams[valid], kind='stable')
+        self._gram_positions = valid[order]
+        self._sorted_grams = self._grams[self._gram_positions]
+
+    @staticmethod
+    def __trigrams(data: np.ndarray) -> np.ndarray:
+        # trigram code starting at each position, -1 when the trigram contains a separator or runs past the end
+        grams = np.full(len(data), -1, dtype=np.int32)
+        if len(data) < 3:
+            return grams
+        b0, b1, b2 = data[:-2].astype(np.int32), data[1:-1].astype(np.int32), data[2:].astype(np.int32)
+        valid = (b0 != SEPARATOR) & (b1 != SEPARATOR) & (b2 != SEPARATOR)
+        grams[:-2] = np.where(valid, (b0 << 16) | (b1 << 8) | b2, -1)
+        return grams
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: str, within: Optional[np.ndarray] = None) -> np.ndarray:
+        # positions of the matching objects: substations, then voltage levels, then equipments.
+        # within: positions of the objects to search, typically the result of a query contained in this one
+        if not query:
+            return np.arange(len(self), dtype=np.int64) if within is None else np.sort(within)
+        pattern = np.frombuffer(query.lower().encode('utf-8'), dtype=np.uint8)
+        if (pattern == SEPARATOR).any():
+            return np.empty(0, dtype=np.int64)
+        if len(pattern) >= 3:
+            starts = self.__match(self.__trigrams(pattern)[:len(pattern) - 2], within)
+        elif within is not None:
+            starts = self.__scan(pattern, self.__object_bytes(within))
+        else:
+            starts = self.__scan(pattern, np.arange(len(self._data) - len(pattern) + 1))
+        # starts are in the objects searched, a match never spans two objects
+        matched = np.zeros(len(self), dtype=bool)
+        matched[self._owners[starts]] = True
+        return np.flatnonzero(matched)
+
+    def __object_bytes(self, positions: np.ndarray) -> np.ndarray:
+        # buffer positions of the ids and names of the objects
+        starts = self._offsets[positions]
+        lengths = self._offsets[positions + 1] - starts
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    def __scan(self, pattern: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        for offset, byte in enumerate(pattern):
+            starts = starts[self._data.take(starts + offset, mode='clip') == byte]
+        return starts
+
+    def __match(self, query_grams: np.ndarray, within: Optional[np.ndarray]) -> np.ndarray:
+        lower = np.searchsorted(self._sorted_grams, query_grams, side='left')
+        upper = np.searchsorted(self._sorted_grams, query_grams, side='right')
+        rarest = int(np.argmin(upper - lower))
+        within_size = None if within is None else (self._offsets[within + 1] - self._offsets[within]).sum()
+        if within_size is not None and within_size < upper[rarest] - lower[rarest]:
+            # fewer bytes in the objects searched than occurrences of the rarest trigram: all their bytes are checked
+            starts = self.__object_bytes(within)
+            rarest = -1
+        else:
+            starts = self._gram_positions[lower[rarest]:upper[rarest]] - rarest
+            starts = starts[starts >= 0]
+            if within is not None:
+                allowed = np.zeros(len(self), dtype=bool)
+                allowed[within] = True
+                starts = starts[allowed[self._owners[starts]]]
+        for offset, gram in enumerate(query_grams):
+            if offset != rarest and len(starts):
+                # past the end clips to the last position, never a valid trigram
+                starts = starts[self._grams.take(starts + offset, mode='clip') == gram]
+        return starts
+
+    def hits(self, query: str, limit: Optional[int] = None) -> List[SearchHit]:
+        positions = self.search(query)
+        if limit is not None:
+            positions = positions[:limit]
+        return [self.get_hit(position) for position in positions]
+
+    def get_hit(self, position: int) -> SearchHit:
+        object_type, object_id, name = self._object_types[position], self._ids[position], self._names[position]
+        if position < self._substation_count:
+            return SearchHit(object_type, object_id, name)
+        if position < self._substation_count + self._voltage_level_count:
+            return SearchHit(object_type, object_id, name, object_id)
+        connection = self._network_structure.connection_table.get_connection(int(self._rows[position]))
+        return SearchHit(ns.EquipmentType(object_type), object_id, name,
+                         connection.voltage_level.voltage_level_id, connection)
+
+    def substation_ids(self, positions: np.ndarray) -> List[str]:
+        return self._ids[positions[positions < self._substation_count]].tolist()
+
+    def voltage_level_ids(self, positions: np.ndarray) -> List[str]:
+        # matching voltage levels and voltage levels of any side of the matching equipments
+        voltage_level_positions = positions[(positions >= self._substation_count) &
+                                            (positions < self._substation_count + self._voltage_level_count)]
+        voltage_level_ids = self._ids[voltage_level_positions].tolist()
+        rows = self._rows[positions[positions >= self._substation_count + self._voltage_level_count]]
+        if len(rows):
+            connection_table = self._network_structure.connection_table
+            # rows of a same equipment are contiguous: its sides are the rows after the first one with the same id
+            candidates = np.minimum(rows[:, np.newaxis] + np.arange(3), len(connection_table) - 1)
+            same = connection_table.equipment_ids[candidates] == connection_table.equipment_ids[rows][:, np.newaxis]
+            all_rows = candidates[same]
+            voltage_level_ids.extend(connection_table.voltage_level_ids(all_rows))
+        return list(dict.fromkeys(voltage_level_ids))
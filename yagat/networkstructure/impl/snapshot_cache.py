@@ -0,0 +1,152 @@
+#
+# Copyright (c) 2024, Damien Jeandemange (https://github.com/jeandemanged)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import List, Optional
+
+import pandas as pd
+import pypowsybl.network as pn
+
+import yagat.networkstructure as ns
+
+# bump when the content of a snapshot changes, older snapshots are then ignored
+SNAPSHOT_FORMAT_VERSION = 4
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024 * 1024
+NETWORK_FILE = 'network.biidm'
+METADATA_FILE = 'metadata.json'
+INDEX_COLUMN = '__index__'
+
+
+def default_cache_directory() -> str:
+    return os.path.join(os.path.expanduser('~'), '.cache', 'yagat', 'snapshots')
+
+
+# On disk cache of opened network files: the network as binary IIDM and the NetworkStructure tables as Feather files.
+# A snapshot is keyed by the source file path, size, modification time and content hash, and by the compact mode
+# of its tables.
+class SnapshotCache:
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._directory = directory or default_cache_directory()
+        self._max_bytes = max_bytes
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int):
+        self._max_bytes = value
+        self.evict()
+
+    @staticmethod
+    def compute_key(path: str, compact: bool = False) -> str:
+        stat = os.stat(path)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f'{SNAPSHOT_FORMAT_VERSION}|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|'
+                      f'{compact}'.encode())
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    # key: compute_key(path, compact), computed again if not given
+    def load(self, path: str, compact: bool = False, key: Optional[str] = None) -> 'Optional[ns.NetworkStructure]':
+        snapshot_directory = os.path.join(self._directory, key or self.compute_key(path, compact))
+        metadata_file = os.path.join(snapshot_directory, METADATA_FILE)
+        if not os.path.exists(metadata_file):
+            return None
+        logging.info(f'restoring {path} from snapshot {snapshot_directory}')
+        with open(metadata_file) as file:
+            metadata = json.load(file)
+        network = pn.load(os.path.join(snapshot_directory, NETWORK_FILE))
+        tables = {}
+        for name, index_names in metadata['tables'].items():
+            df = pd.read_feather(os.path.join(snapshot_directory, f'{name}.feather'))
+            df = df.set_index([f'{INDEX_COLUMN}{level}' for level in range(len(index_names))])
+            df.index.names = index_names
+            tables[name] = df
+        # most recently used snapshots are evicted last
+        os.utime(snapshot_directory)
+        return ns.NetworkStructure(network, tables, compact)
+
+    # key: compute_key(path, network_structure.compact), computed again if not given
+    def store(self, path: str, network_structure: 'ns.NetworkStructure', key: Optional[str] = None) -> None:
+        snapshot_directory = os.path.join(self._directory, key or self.compute_key(path, network_structure.compact))
+        logging.info(f'storing snapshot of {path} to {snapshot_directory}')
+        os.makedirs(self._directory, exist_ok=True)
+        # unique, two stores of the same file may run at once
+        tmp_directory = tempfile.mkdtemp(prefix=os.path.basename(snapshot_directory), suffix='.tmp',
+                                         dir=self._directory)
+        try:
+            network_structure.network.save(os.path.join(tmp_directory, NETWORK_FILE), format='BIIDM')
+            network_structure.load_tables()
+            tables = network_structure.get_snapshot_tables()
+            for name, df in tables.items():
+                # index levels stored as regular columns, their names in the metadata
+                df = df.rename_axis([f'{INDEX_COLUMN}{level}' for level in range(df.index.nlevels)])
+                df.reset_index().to_feather(os.path.join(tmp_directory, f'{name}.feather'))
+            metadata = {'format_version': SNAPSHOT_FORMAT_VERSION,
+                        'source_path': os.path.abspath(path),
+                        'compact': network_structure.compact,
+                        'tables': {name: list(df.index.names) for name, df in tables.items()}}
+            with open(os.path.join(tmp_directory, METADATA_FILE), 'w') as file:
+                json.dump(metadata, file)
+        except BaseException:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            raise
+        shutil.rmtree(snapshot_directory, ignore_errors=True)
+        os.replace(tmp_directory, snapshot_directory)
+        self.evict()
+
+    def invalidate(self, path: str) -> None:
+        source_path = os.path.abspath(path)
+        for snapshot_directory in self.__snapshot_directories():
+            with open(os.path.join(snapshot_directory, METADATA_FILE)) as file:
+                if json.load(file)['source_path'] == source_path:
+                    logging.info(f'removing snapshot {snapshot_directory}')
+                    shutil.rmtree(snapshot_directory, ignore_errors=True)
+
+    def clear(self) -> None:
+        logging.info(f'clearing snapshot cache {self._directory}')
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(self.__directory_size(d) for d in self.__snapshot_directories())
+
+    def evict(self) -> None:
+        # least recently used snapshots first
+        snapshot_directories = sorted(self.__snapshot_directories(), key=os.path.getmtime)
+        sizes = [self.__directory_size(d) for d in snapshot_directories]
+        total = sum(sizes)
+        for snapshot_directory, size in zip(snapshot_directories, sizes):
+            if total <= self._max_bytes:
+                break
+            logging.info(f'evicting snapshot {snapshot_directory}')
+            shutil.rmtree(snapshot_directory, ignore_errors=True)
+            total -= size
+
+    def __snapshot_directories(self) -> List[str]:
+        if not os.path.isdir(self._directory):
+            return []
+        # snapshots being stored are not listed
+        return [os.path.join(self._directory, name) for name in os.listdir(self._directory)
+                if not name.endswith('.tmp') and os.path.exists(os.path.join(self._directory, name, METADATA_FILE))]
+
+    @staticmethod
+    def __directory_size(directory: str) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
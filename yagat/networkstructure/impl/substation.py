@@ -33,7 +33,7 @@ class Substation:
 
     @property
     def voltage_levels(self) -> List['ns.VoltageLevel']:
-        return sorted(self._voltage_levels.values(), key=lambda vl: vl.get_data().nominal_v, reverse=True)
+        return self.network_structure.get_substation_voltage_levels(self)
 
     def get_voltage_level(self, voltage_level_id: str) -> Optional['ns.VoltageLevel']:
         if voltage_level_id in self._voltage_levels:
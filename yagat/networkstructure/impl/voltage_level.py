@@ -5,7 +5,7 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 # SPDX-License-Identifier: MPL-2.0
 #
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 import pandas as pd
 
@@ -14,12 +14,12 @@ import yagat.networkstructure as ns
 
 class VoltageLevel:
     def __init__(self, network_structure: 'ns.NetworkStructure', substation: 'Optional[ns.Substation]',
-                 voltage_level_id: str, name: Optional[str] = None):
+                 voltage_level_id: str, name: Optional[str] = None, index: int = 0):
         self._network_structure = network_structure
         self._substation = substation
         self._voltage_level_id = voltage_level_id
         self._name = name
-        self._connections: Dict[(str, Optional[int]), 'ns.Connection'] = {}
+        self._index = index
 
     @property
     def voltage_level_id(self) -> str:
@@ -31,6 +31,10 @@ class VoltageLevel:
             return self._name
         return self._voltage_level_id
 
+    @property
+    def index(self) -> int:
+        return self._index
+
     @property
     def substation(self) -> 'Optional[ns.Substation]':
         return self._substation
@@ -39,30 +43,23 @@ class VoltageLevel:
     def network_structure(self) -> 'ns.NetworkStructure':
         return self._network_structure
 
-    def add_connection(self, connection: 'ns.Connection'):
-        self._connections[(connection.equipment_id, connection.side)] = connection
-
     @property
     def connections(self) -> List['ns.Connection']:
-        return list(self._connections.values())
+        connection_table = self.network_structure.connection_table
+        return connection_table.get_connections(connection_table.voltage_level_rows(self._index))
 
     def get_buses(self, bus_view: 'ns.BusView') -> pd.DataFrame:
-        df = None
-        match bus_view:
-            case ns.BusView.BUS_BRANCH:
-                df = self.network_structure.buses
-            case ns.BusView.BUS_BREAKER:
-                df = self.network_structure.buses_bus_breaker_view
-        return df.loc[df['voltage_level_id'] == self.voltage_level_id]
+        return self.network_structure.get_voltage_level_buses(self, bus_view)
 
     def get_bus_connections(self, bus_view: 'ns.BusView', bus_id: str) -> List['ns.Connection']:
-        bus_connections = [c for c in self._connections.values() if c.get_bus_id(bus_view) == bus_id]
-        return bus_connections
+        return self.network_structure.get_bus_connections(self, bus_view, bus_id)
 
     def get_connection(self, connection_id: str, side: Optional[int] = None) -> Optional['ns.Connection']:
-        if (connection_id, side) in self._connections:
-            return self._connections[(connection_id, side)]
-        return None
+        connection_table = self.network_structure.connection_table
+        row = connection_table.find(connection_id, side)
+        if row is None or connection_table.voltage_level_indices[row] != self._index:
+            return None
+        return connection_table.get_connection(row)
 
     def get_data(self) -> pd.DataFrame:
         return self.network_structure.get_voltage_level_data(self)
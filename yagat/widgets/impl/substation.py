@@ -82,9 +82,12 @@ class Bus(tk.Frame):
 
 
 class Connection(tk.Frame):
-    def __init__(self, parent, connection: 'ns.Connection', navigate_command, *args, **kwargs):
+    def __init__(self, parent, connection: 'ns.Connection', navigate_command, values=None, *args, **kwargs):
         tk.Frame.__init__(self, parent, *args, **kwargs)
 
+        if values is None:
+            values = connection.network_structure.get_connections_values([connection])[0]
+
         self.canvas = tk.Canvas(self, width=550, height=60, highlightthickness=0)
         self.canvas.create_line(0, 0, 0, 60, fill="black", width=15)
         self.canvas.create_line(0, 30, 30, 30, fill="black", width=2)
@@ -93,7 +96,7 @@ class Connection(tk.Frame):
         if connection.equipment_type == ns.EquipmentType.SWITCH:
             self.canvas.create_line(30, 30, 50, 30, fill="black", width=2)
         else:
-            if connection.get_connected():
+            if values.connected:
                 self.canvas.create_line(30, 30, 50, 30, fill="black", width=3)
             else:
                 self.canvas.create_line(30, 40, 50, 30, fill="black", width=3)
@@ -136,11 +139,11 @@ class Connection(tk.Frame):
         self._name_label.place(x=30, y=5)
 
         if connection.equipment_type != ns.EquipmentType.SWITCH:
-            self._p = tk.StringVar(value=format_power(connection.get_p()))
+            self._p = tk.StringVar(value=format_power(values.p))
             self._p_label = pw.LabelValue(self, '', self._p, 'MW')
             self._p_label.place(x=80, y=33)
 
-            self._q = tk.StringVar(value=format_power(connection.get_q()))
+            self._q = tk.StringVar(value=format_power(values.q))
             self._q_label = pw.LabelValue(self, '', self._q, 'Mvar')
             self._q_label.place(x=180, y=33)
 